@@ -1,12 +1,52 @@
 """Patient-Specific Modeling in Python"""
 
-from biomass.construction import Text2Model
-from biomass.core import *
-from biomass.result import OptimizationResults
+import importlib
+from typing import Any, List
 
+from .feature_store import FeatureStore
 from .individualization import Individualization
-from .patient_model import PatientModelAnalyses, PatientModelSimulations
+from .patient_model import (
+    PatientModelAnalyses,
+    PatientModelSimulations,
+    PatientOverlay,
+    PatientResult,
+    WorkerPool,
+)
 from .version import __version__
 
 __author__ = __maintainer__ = "Hiroaki Imoto"
 __email__ = "himoto@protein.osaka-u.ac.jp"
+
+# BioMASS imports matplotlib and seaborn, so it is imported on first access.
+_biomass_attrs = {
+    "Text2Model": "biomass.construction",
+    "Model": "biomass.core",
+    "create_model": "biomass.core",
+    "optimize": "biomass.core",
+    "run_simulation": "biomass.core",
+    "run_analysis": "biomass.core",
+    "OptimizationResults": "biomass.result",
+}
+
+__all__ = [
+    "FeatureStore",
+    "Individualization",
+    "PatientModelAnalyses",
+    "PatientModelSimulations",
+    "PatientOverlay",
+    "PatientResult",
+    "WorkerPool",
+    *_biomass_attrs,
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _biomass_attrs:
+        value = getattr(importlib.import_module(_biomass_attrs[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted([*globals(), *_biomass_attrs])
@@ -0,0 +1,258 @@
+"""
+Cluster patients based on response characteristics.
+"""
+
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class Clustering(object):
+    """
+    Assign patients to clusters without drawing a clustermap.
+
+    Hierarchical clustering uses ``fastcluster`` if it is installed, whose memory-saving
+    routines avoid the full distance matrix for 'single', 'ward', 'centroid' and 'median'
+    linkages with euclidean distance; otherwise ``scipy.cluster.hierarchy.linkage``
+    is used. Mini-batch k-means scales linearly with the number of patients.
+
+    Attributes
+    ----------
+    n_clusters : int
+        The number of clusters.
+
+    method : Literal["hierarchical", "kmeans"] (default: "hierarchical")
+        Clustering algorithm.
+
+    linkage_method : str (default: "ward")
+        Linkage method for hierarchical clustering.
+
+    metric : str (default: "euclidean")
+        Distance metric for hierarchical clustering.
+
+    z_score : bool (default: :obj:`True`)
+        If :obj:`True`, each feature is standardized before clustering.
+        Missing values are replaced by the mean of the feature.
+
+    batch_size : int (default: 1024)
+        The number of patients in each mini-batch of k-means.
+
+    max_iter : int (default: 100)
+        The maximum number of mini-batches of k-means.
+
+    tol : float (default: 1e-4)
+        k-means stops when no center moves more than ``tol``.
+
+    random_state : int, optional
+        Seed for k-means.
+
+    Examples
+    --------
+    >>> from pasmopy import FeatureStore
+    >>> from pasmopy.clustering import Clustering
+    >>> features = FeatureStore("classification/features.npz").read()
+    >>> clustering = Clustering(4, method="kmeans", random_state=0)
+    >>> labels = clustering.fit_predict(features)
+    >>> clustering.heatmap(features, labels, "subtypes.pdf")
+    """
+
+    n_clusters: int
+    method: Literal["hierarchical", "kmeans"] = field(default="hierarchical")
+    linkage_method: str = field(default="ward")
+    metric: str = field(default="euclidean")
+    z_score: bool = field(default=True)
+    batch_size: int = field(default=1024)
+    max_iter: int = field(default=100)
+    tol: float = field(default=1e-4)
+    random_state: Optional[int] = field(default=None)
+
+    def __post_init__(self) -> None:
+        if self.method not in ["hierarchical", "kmeans"]:
+            raise ValueError("method must be either 'hierarchical' or 'kmeans'.")
+        if self.n_clusters < 1:
+            raise ValueError("n_clusters must be a positive integer.")
+
+    def _standardize(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Features as a float array, standardized if ``self.z_score`` is :obj:`True`.
+        """
+        values = features.to_numpy(dtype=float, copy=True)
+        mean = np.nanmean(values, axis=0)
+        if self.z_score:
+            std = np.nanstd(values, axis=0)
+            std[~(std > 0)] = 1.0
+            values = (values - mean) / std
+            mean = np.zeros_like(mean)
+        missing = np.isnan(values)
+        values[missing] = np.take(np.nan_to_num(mean), np.nonzero(missing)[1])
+        return values
+
+    def _hierarchical(self, values: np.ndarray) -> np.ndarray:
+        """
+        Labels of hierarchical clustering.
+        """
+        from scipy.cluster.hierarchy import fcluster, linkage
+
+        try:
+            import fastcluster
+        except ImportError:
+            linkage_matrix = linkage(values, method=self.linkage_method, metric=self.metric)
+        else:
+            if self.linkage_method in ["single", "ward", "centroid", "median"]:
+                linkage_matrix = fastcluster.linkage_vector(
+                    values, method=self.linkage_method, metric=self.metric
+                )
+            else:
+                linkage_matrix = fastcluster.linkage(
+                    values, method=self.linkage_method, metric=self.metric
+                )
+        return fcluster(linkage_matrix, self.n_clusters, criterion="maxclust") - 1
+
+    @staticmethod
+    def _nearest(values: np.ndarray, centers: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+        """
+        Index of the nearest center of each row, computed in chunks.
+        """
+        squared_norms = np.einsum("ij,ij->i", centers, centers)
+        return np.concatenate(
+            [
+                np.argmin(squared_norms - 2 * values[i : i + chunk_size] @ centers.T, axis=1)
+                for i in range(0, len(values), chunk_size)
+            ]
+        )
+
+    def _kmeans(self, values: np.ndarray) -> np.ndarray:
+        """
+        Labels of mini-batch k-means (k-means++ initialization).
+        """
+        rng = np.random.default_rng(self.random_state)
+        n_samples = len(values)
+        n_clusters = min(self.n_clusters, n_samples)
+        # k-means++ on a subsample
+        sample = values[rng.choice(n_samples, min(n_samples, 10 * self.batch_size), False)]
+        centers = np.empty((n_clusters, values.shape[1]))
+        centers[0] = sample[rng.integers(len(sample))]
+        distances = np.sum((sample - centers[0]) ** 2, axis=1)
+        for k in range(1, n_clusters):
+            total = distances.sum()
+            i = (
+                rng.choice(len(sample), p=distances / total)
+                if total > 0
+                else rng.integers(len(sample))
+            )
+            centers[k] = sample[i]
+            distances = np.minimum(distances, np.sum((sample - centers[k]) ** 2, axis=1))
+        counts = np.zeros(n_clusters)
+        for _ in range(self.max_iter):
+            batch = values[rng.choice(n_samples, min(n_samples, self.batch_size), False)]
+            nearest = self._nearest(batch, centers)
+            batch_counts = np.bincount(nearest, minlength=n_clusters)
+            sums = np.zeros_like(centers)
+            np.add.at(sums, nearest, batch)
+            counts += batch_counts
+            updated = batch_counts > 0
+            shift = (
+                sums[updated] - batch_counts[updated, np.newaxis] * centers[updated]
+            ) / counts[updated, np.newaxis]
+            centers[updated] += shift
+            if not shift.size or np.max(np.abs(shift)) <= self.tol:
+                break
+        return self._nearest(values, centers)
+
+    def fit_predict(self, features: pd.DataFrame) -> pd.Series:
+        """
+        Assign patients to clusters.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame
+            Response characteristics (patients x features).
+
+        Returns
+        -------
+        labels : pandas.Series
+            Cluster labels (0, 1, ...) indexed by patient.
+        """
+        values = self._standardize(features)
+        labels = (
+            self._hierarchical(values) if self.method == "hierarchical" else self._kmeans(values)
+        )
+        return pd.Series(labels, index=features.index, name="cluster")
+
+    def heatmap(
+        self,
+        features: pd.DataFrame,
+        labels: pd.Series,
+        fname: str,
+        max_rows: int = 1000,
+        aggregate: bool = False,
+        **heatmap_kws,
+    ) -> None:
+        """
+        Draw a heatmap of standardized features sorted by cluster.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame
+            Response characteristics (patients x features).
+
+        labels : pandas.Series
+            Cluster labels returned by :meth:`fit_predict`.
+
+        fname : str
+            The heatmap is saved as fname.
+
+        max_rows : int (default: 1000)
+            If there are more patients, each cluster is downsampled in proportion to its size.
+
+        aggregate : bool (default: :obj:`False`)
+            If :obj:`True`, the mean of each cluster is drawn instead of patients.
+
+        **heatmap_kws
+            Keyword arguments to pass to ``seaborn.heatmap()``.
+        """
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
+        view = pd.DataFrame(self._standardize(features), index=features.index)
+        view.columns = [
+            (
+                "_".join([str(label).replace("_", " ") for label in column])
+                if isinstance(column, tuple)
+                else str(column)
+            )
+            for column in features.columns
+        ]
+        labels = labels.loc[features.index]
+        if aggregate:
+            view = view.groupby(labels.to_numpy()).mean()
+            view.index = [
+                f"cluster {label} (n={n})"
+                for label, n in labels.value_counts().sort_index().items()
+            ]
+        else:
+            if len(view) > max_rows:
+                rng = np.random.default_rng(self.random_state)
+                view = view.groupby(labels.to_numpy(), group_keys=False).apply(
+                    lambda group: group.iloc[
+                        np.sort(
+                            rng.choice(
+                                len(group),
+                                max(1, round(len(group) * max_rows / len(labels))),
+                                replace=False,
+                            )
+                        )
+                    ]
+                )
+            view = view.iloc[np.argsort(labels.loc[view.index].to_numpy(), kind="stable")]
+        heatmap_kws.setdefault("cmap", "RdBu_r")
+        heatmap_kws.setdefault("center", 0)
+        heatmap_kws.setdefault("yticklabels", aggregate or len(view) <= 100)
+        fig, ax = plt.subplots(figsize=(max(6, 0.3 * view.shape[1]), 8))
+        sns.heatmap(view, ax=ax, **heatmap_kws)
+        fig.tight_layout()
+        fig.savefig(fname)
+        plt.close(fig)
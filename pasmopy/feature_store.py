@@ -0,0 +1,162 @@
+"""
+Store response characteristics of patient-specific models in a single columnar file.
+"""
+
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_VERSION: int = 1
+
+
+@dataclass
+class FeatureStore(object):
+    """
+    Columnar table of response characteristics (patients x features) saved as ``.npz``.
+
+    Each column is identified by an (observable, condition, metric) triple and
+    all values are stored as 64-bit floats, so that the table is read back with typed
+    columns and without parsing text.
+
+    Attributes
+    ----------
+    path : str
+        Path to the ``.npz`` file.
+
+    Examples
+    --------
+    >>> from pasmopy import FeatureStore
+    >>> features = FeatureStore("classification/features.npz").read()
+    >>> features["Phosphorylated_Akt", "EGF", "max"]
+    """
+
+    path: str
+
+    def exists(self) -> bool:
+        """
+        Whether the file exists.
+        """
+        return os.path.isfile(self.path)
+
+    def read(self) -> pd.DataFrame:
+        """
+        Read response characteristics.
+
+        Returns
+        -------
+        features : pandas.DataFrame
+            Features indexed by ``Sample`` with (observable, condition, metric) columns.
+        """
+        with np.load(self.path, allow_pickle=False) as data:
+            if int(data["version"]) != SCHEMA_VERSION:
+                raise ValueError(f"Unsupported schema version: {int(data['version'])}")
+            return pd.DataFrame(
+                data["values"],
+                index=pd.Index(data["samples"].tolist(), name="Sample"),
+                columns=pd.MultiIndex.from_arrays(
+                    [
+                        data["observables"].tolist(),
+                        data["conditions"].tolist(),
+                        data["metrics"].tolist(),
+                    ],
+                    names=["observable", "condition", "metric"],
+                ),
+            )
+
+    def read_fingerprints(self) -> Tuple[str, Dict[str, str]]:
+        """
+        Read fingerprints recorded with response characteristics.
+
+        Returns
+        -------
+        spec : str
+            Fingerprint of the extraction settings.
+
+        fingerprints : Dict[str, str]
+            Fingerprint of the simulation results of each sample.
+        """
+        with np.load(self.path, allow_pickle=False) as data:
+            if "fingerprints" not in data.files:
+                return "", {}
+            return str(data["spec"]), dict(
+                zip(data["samples"].tolist(), data["fingerprints"].tolist())
+            )
+
+    def write(
+        self,
+        features: pd.DataFrame,
+        fingerprints: Optional[Dict[str, str]] = None,
+        spec: str = "",
+    ) -> None:
+        """
+        Write response characteristics, replacing the existing file.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame
+            Features indexed by sample with (observable, condition, metric) columns.
+
+        fingerprints : Dict[str, str], optional
+            Fingerprint of the simulation results of each sample.
+
+        spec : str (default: "")
+            Fingerprint of the extraction settings.
+        """
+        if fingerprints is None:
+            fingerprints = {}
+        dirname = os.path.dirname(self.path) or "."
+        os.makedirs(dirname, exist_ok=True)
+        columns: Dict[str, np.ndarray] = {
+            name: np.array(
+                [str(label) for label in features.columns.get_level_values(level)], dtype=str
+            )
+            for name, level in zip(["observables", "conditions", "metrics"], range(3))
+        }
+        fd, tmpfile = tempfile.mkstemp(dir=dirname, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    version=np.array(SCHEMA_VERSION),
+                    samples=np.array([str(sample) for sample in features.index], dtype=str),
+                    values=features.to_numpy(dtype=float),
+                    fingerprints=np.array(
+                        [fingerprints.get(str(sample), "") for sample in features.index],
+                        dtype=str,
+                    ),
+                    spec=np.array(spec),
+                    **columns,
+                )
+            os.replace(tmpfile, self.path)
+        finally:
+            if os.path.isfile(tmpfile):
+                os.remove(tmpfile)
+
+    def append(
+        self,
+        features: pd.DataFrame,
+        fingerprints: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Add or update rows of patients.
+
+        Parameters
+        ----------
+        features : pandas.DataFrame
+            Features indexed by sample with (observable, condition, metric) columns.
+            Existing rows of the same samples are replaced.
+
+        fingerprints : Dict[str, str], optional
+            Fingerprint of the simulation results of each sample.
+        """
+        spec = ""
+        if self.exists():
+            stored = self.read()
+            spec, stored_fingerprints = self.read_fingerprints()
+            features = pd.concat([stored.drop(index=features.index, errors="ignore"), features])
+            fingerprints = {**stored_fingerprints, **(fingerprints or {})}
+        self.write(features, fingerprints, spec)
@@ -1,8 +1,178 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+_transcriptomes: Dict[Hashable, pd.DataFrame] = {}
+_transcriptomes_lock = threading.Lock()
+_patient_id: ContextVar[Optional[str]] = ContextVar("patient_id", default=None)
+
+
+def _freeze(obj) -> Hashable:
+    """
+    Convert keyword arguments into a hashable object.
+    """
+    if isinstance(obj, dict):
+        return tuple(sorted((key, _freeze(value)) for key, value in obj.items()))
+    elif isinstance(obj, (list, tuple, set)):
+        return tuple(_freeze(value) for value in obj)
+    elif isinstance(obj, Hashable):
+        return obj
+    return repr(obj)
+
+
+def _cache_key(path: str, read_csv_kws: dict, cache_dir: str) -> str:
+    """
+    Return a key identifying the content of ``path`` read with ``read_csv_kws``.
+
+    Local files are identified by the SHA-256 hash of their content. The hash is computed once
+    and looked up afterwards from the path, modification time and size of the file.
+    Other paths, e.g., URLs, are identified by the path only, so their caches are never
+    invalidated.
+    """
+    options = repr(_freeze(read_csv_kws))
+    if not os.path.isfile(path):
+        return hashlib.sha256(f"{path}\n{options}".encode()).hexdigest()
+    stat = os.stat(path)
+    source = os.path.join(
+        cache_dir,
+        "sources",
+        hashlib.sha256(
+            f"{os.path.abspath(path)}\n{stat.st_mtime_ns}\n{stat.st_size}\n{options}".encode()
+        ).hexdigest(),
+    )
+    if os.path.isfile(source):
+        with open(source, mode="r", encoding="utf-8") as f:
+            key = f.read().strip()
+        if key:
+            return key
+    content = hashlib.sha256()
+    with open(path, mode="rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            content.update(chunk)
+    content.update(options.encode())
+    key = content.hexdigest()
+    # Written to a temporary file and moved into place, so that other processes never read
+    # a partially written key.
+    os.makedirs(os.path.dirname(source), exist_ok=True)
+    fd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(source))
+    try:
+        with os.fdopen(fd, mode="w", encoding="utf-8") as f:
+            f.write(key)
+        os.replace(tmpfile, source)
+    finally:
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+    return key
+
+
+def _write_binary_cache(data: pd.DataFrame, dirname: str) -> None:
+    """
+    Save expression levels as a (genes x samples) ``.npy`` array with index sidecars.
+
+    Files are written to a temporary directory first and moved into place, so that processes
+    converting the same data concurrently never observe a partially written cache.
+    """
+    data = data.select_dtypes("number")
+    parent = os.path.dirname(dirname)
+    os.makedirs(parent, exist_ok=True)
+    tmpdir = tempfile.mkdtemp(dir=parent)
+    try:
+        np.save(os.path.join(tmpdir, "expression.npy"), data.to_numpy(dtype=float))
+        with open(os.path.join(tmpdir, "index.json"), mode="w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "name": data.index.name,
+                    "genes": [str(gene) for gene in data.index],
+                    "samples": [str(sample) for sample in data.columns],
+                },
+                f,
+            )
+        os.replace(tmpdir, dirname)
+    except OSError:
+        if not os.path.isdir(dirname):
+            raise
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def _read_binary_cache(
+    dirname: str,
+    genes: Tuple[str, ...],
+    memory_map: bool = False,
+) -> pd.DataFrame:
+    """
+    Read expression levels of ``genes`` from a binary cache.
+
+    The array is memory-mapped, so only rows of the requested genes are read from disk.
+    If ``memory_map`` is :obj:`True`, the whole table is returned as a read-only view of the
+    memory-mapped array instead of a copy, so that processes using the same cache share
+    a single physical copy of the data through the page cache.
+    """
+    with open(os.path.join(dirname, "index.json"), mode="r", encoding="utf-8") as f:
+        index = json.load(f)
+    expression = np.load(os.path.join(dirname, "expression.npy"), mmap_mode="r")
+    if memory_map:
+        return pd.DataFrame(
+            expression,
+            index=pd.Index(index["genes"], name=index["name"]),
+            columns=index["samples"],
+            copy=False,
+        )
+    wanted = set(genes)
+    rows = [i for i, gene in enumerate(index["genes"]) if gene in wanted]
+    return pd.DataFrame(
+        np.array(expression[rows]),
+        index=pd.Index([index["genes"][i] for i in rows], name=index["name"]),
+        columns=index["samples"],
+    )
+
+
+def _load_transcriptomic_data(
+    path: str,
+    genes: Tuple[str, ...],
+    read_csv_kws: dict,
+    cache_dir: Optional[str] = None,
+    memory_map: bool = False,
+) -> pd.DataFrame:
+    """
+    Return expression levels of ``genes``, reading each file at most once per process.
+
+    Loaded tables are kept in a process-wide registry keyed by the file, the read options
+    and the gene subset, so that patient-specific models sharing the same data
+    (and imported in the same process) share a single, read-only table.
+    If ``cache_dir`` is given, the CSV file is converted to a binary format on first use
+    and subsequent reads never parse text again.
+    """
+    if memory_map and cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), "pasmopy")
+    if os.path.isfile(path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size, _freeze(read_csv_kws), genes, memory_map)
+    else:
+        key = (path, None, None, _freeze(read_csv_kws), genes, memory_map)
+    with _transcriptomes_lock:
+        if key not in _transcriptomes:
+            if cache_dir is None:
+                data = pd.read_csv(path, **read_csv_kws)
+                _transcriptomes[key] = data.loc[data.index.isin(genes)].copy()
+            else:
+                dirname = os.path.join(cache_dir, _cache_key(path, read_csv_kws, cache_dir))
+                if not os.path.isfile(os.path.join(dirname, "index.json")):
+                    _write_binary_cache(pd.read_csv(path, **read_csv_kws), dirname)
+                _transcriptomes[key] = _read_binary_cache(dirname, genes, memory_map)
+        return _transcriptomes[key]
+
 
 @dataclass
 class Individualization(object):
@@ -36,6 +206,20 @@ class Individualization(object):
 
     read_csv_kws : dict, optional
         Keyword arguments to pass to ``pandas.read_csv``.
+        Each file is read only once per process and shared among all instances
+        using the same data and options; only genes in ``gene_expression`` are kept.
+
+    cache_dir : str, optional
+        Directory to cache ``transcriptomic_data`` in a binary format.
+        The CSV file is converted once, keyed by its content and ``read_csv_kws``,
+        and only the required genes are read from the cache afterwards.
+        Files that are not local, e.g., URLs, are keyed by their path instead of content,
+        so the cache is never invalidated; remove ``cache_dir`` to read them again.
+
+    memory_map : bool (default: :obj:`False`)
+        If :obj:`True`, ``expression_level`` is backed by a read-only memory-mapped array
+        in ``cache_dir`` (a ``pasmopy`` folder in the system temporary directory if not given),
+        so that worker processes share a single physical copy of the transcriptome.
 
     prefix : str (default: "w_")
         Prefix of weighting factors on gene expression levels.
@@ -111,39 +295,108 @@ class Individualization(object):
     transcriptomic_data: str
     gene_expression: Dict[str, List[str]]
     read_csv_kws: Optional[dict] = field(default=None)
+    cache_dir: Optional[str] = field(default=None)
+    memory_map: bool = field(default=False)
     prefix: str = field(default="w_", init=False)
 
     def __post_init__(self) -> None:
         kwargs = self.read_csv_kws
         if kwargs is None:
             kwargs = {}
-        self._expression_level: pd.DataFrame = pd.read_csv(self.transcriptomic_data, **kwargs)
+        self._expression_level: pd.DataFrame = _load_transcriptomic_data(
+            self.transcriptomic_data,
+            tuple(gene for genes in self.gene_expression.values() for gene in genes),
+            kwargs,
+            self.cache_dir,
+            self.memory_map,
+        )
+        self._weight_matrix: Dict[str, np.ndarray] = {}
 
     @property
     def expression_level(self) -> pd.DataFrame:
         return self._expression_level
 
+    @staticmethod
+    def clear_cache() -> None:
+        """
+        Release transcriptomic data shared among instances in the current process.
+        """
+        with _transcriptomes_lock:
+            _transcriptomes.clear()
+
+    @staticmethod
+    @contextmanager
+    def patient(id: str) -> Iterator[None]:
+        """
+        Incorporate gene expression levels of ``id``, whatever id the model passes.
+
+        This allows a single model package to be simulated as different patients.
+
+        Parameters
+        ----------
+        id : str
+            CCLE_ID or TCGA_ID.
+        """
+        token = _patient_id.set(id)
+        try:
+            yield
+        finally:
+            _patient_id.reset(token)
+
+    def _compile(self) -> None:
+        """
+        Resolve indices of proteins, genes and weighting factors once.
+        """
+        self._idx_params: Dict[str, int] = {name: i for i, name in enumerate(self.parameters)}
+        self._idx_proteins: Dict[str, int] = {
+            protein: i for i, protein in enumerate(self.gene_expression)
+        }
+        # Proteins incorporated as reaction rates need not be model species,
+        # so indices of species are resolved by as_initial_conditions.
+        self._idx_species: Optional[List[int]] = None
+        self._genes: List[str] = [
+            gene for genes in self.gene_expression.values() for gene in genes
+        ]
+        self._idx_weighting_factors: np.ndarray = np.array(
+            [self.parameters.index(self.prefix + gene) for gene in self._genes], dtype=np.intp
+        )
+
+    def _get_weight_matrix(self, id: str) -> np.ndarray:
+        """
+        Return the (proteins x weighting factors) matrix of gene expression levels in ``id``.
+
+        The matrix is built once per patient. Each column corresponds to a weighting factor
+        and holds the expression level of its gene in the row of the protein it encodes.
+        """
+        if id not in self._weight_matrix:
+            if not hasattr(self, "_genes"):
+                self._compile()
+            expression = self.expression_level.loc[self._genes, id].to_numpy(dtype=float)
+            weight_matrix = np.zeros((len(self.gene_expression), len(self._genes)))
+            col = 0
+            for row, genes in enumerate(self.gene_expression.values()):
+                for _ in genes:
+                    weight_matrix[row, col] = expression[col]
+                    col += 1
+            self._weight_matrix[id] = weight_matrix
+        return self._weight_matrix[id]
+
     def _calculate_weighted_sum(
         self,
         id: str,
         x: List[float],
-    ) -> Dict[str, float]:
+    ) -> np.ndarray:
         """
         Incorporate gene expression levels in the model.
 
         Returns
         -------
-        weighted_sum : Dict[str, float]
-            Estimated protein levels after incorporating transcriptomic data.
+        weighted_sum : numpy.ndarray
+            Estimated protein levels after incorporating transcriptomic data,
+            in the order of ``gene_expression``.
         """
-        weighted_sum = dict.fromkeys(self.gene_expression, 0.0)
-        for (protein, genes) in self.gene_expression.items():
-            for gene in genes:
-                weighted_sum[protein] += (
-                    x[self.parameters.index(self.prefix + gene)]
-                    * self.expression_level.at[gene, id]
-                )
-        return weighted_sum
+        weight_matrix = self._get_weight_matrix(_patient_id.get() or id)
+        return weight_matrix @ np.asarray(x, dtype=float)[self._idx_weighting_factors]
 
     def as_reaction_rate(
         self,
@@ -174,8 +427,8 @@ class Individualization(object):
         param_value : float
         """
         weighted_sum = self._calculate_weighted_sum(id, x)
-        param_value = x[self.parameters.index(param_name)]
-        param_value *= weighted_sum[protein]
+        param_value = x[self._idx_params[param_name]]
+        param_value *= float(weighted_sum[self._idx_proteins[protein]])
         return param_value
 
     def as_initial_conditions(
@@ -204,6 +457,8 @@ class Individualization(object):
             Cell-line- or patient-specific initial conditions.
         """
         weighted_sum = self._calculate_weighted_sum(id, x)
-        for protein in self.gene_expression.keys():
-            y0[self.species.index(protein)] *= weighted_sum[protein]
+        if self._idx_species is None:
+            self._idx_species = [self.species.index(protein) for protein in self.gene_expression]
+        for i, value in zip(self._idx_species, weighted_sum.tolist()):
+            y0[i] *= value
         return y0
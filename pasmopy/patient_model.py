@@ -1,16 +1,630 @@
-import csv
+import asyncio
+import copy
+import hashlib
+import json
+import math
 import multiprocessing
 import os
-from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Literal, Optional, Union
+import signal
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
-import seaborn as sns
-from biomass import create_model, run_analysis, run_simulation
-from biomass.model_object import ModelObject
-from scipy.integrate import simpson
-from tqdm import tqdm
+
+from .clustering import Clustering
+from .feature_store import FeatureStore
+from .individualization import Individualization
+from .response_characteristics import (
+    auc,
+    duration,
+    final_value,
+    half_life,
+    is_vectorized,
+    maximum,
+    sustained_ratio,
+    time_to_peak,
+    uses_time,
+)
+
+if TYPE_CHECKING:
+    from biomass.model_object import ModelObject
+
+_models: "OrderedDict[str, ModelObject]" = OrderedDict()
+_max_cached_models: int = 0
+
+
+_THREAD_ENV_VARS: Tuple[str, ...] = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def _cpu_quota(root: str = "/sys/fs/cgroup") -> Optional[float]:
+    """
+    CPU quota of the cgroup (v2 or v1), or :obj:`None` if unlimited or unknown.
+    """
+    try:
+        with open(os.path.join(root, "cpu.max"), mode="r") as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us"), mode="r") as f:
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us"), mode="r") as f:
+            period = int(f.read())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+
+def _available_cpus() -> int:
+    """
+    The number of CPUs this process may use, taking CPU affinity and cgroup quota
+    (e.g., container limits) into account, unlike ``multiprocessing.cpu_count()``.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, math.ceil(quota))
+    return max(cpus, 1)
+
+
+def _default_n_proc(threads_per_worker: Optional[int] = None) -> int:
+    """
+    Default number of worker processes, leaving one CPU for the main process.
+    """
+    return max(1, (_available_cpus() - 1) // (threads_per_worker or 1))
+
+
+def _threads_per_worker(n_proc: int, threads_per_worker: Optional[int] = None) -> int:
+    """
+    The number of threads of each worker, dividing available CPUs among workers by default.
+    """
+    if threads_per_worker is not None:
+        return threads_per_worker
+    return max(1, _available_cpus() // max(n_proc, 1))
+
+
+_thread_env_lock = threading.Lock()
+_thread_env_limits: List[int] = []
+_thread_env_saved: Dict[str, Optional[str]] = {}
+
+
+@contextmanager
+def _thread_env(threads: int) -> Iterator[None]:
+    """
+    Set environment variables limiting BLAS/OpenMP threads, which are inherited by
+    worker processes started while the context is active.
+
+    The variables must be set while a pool is alive, not only while it is created:
+    they are read when a worker imports NumPy, before its initializer runs, and workers
+    replaced after ``maxtasksperchild`` tasks are started later.
+
+    Runs in flight at the same time share the process environment: it holds the limit of
+    the latest run still active, and the original values are restored only when the last
+    one exits. Workers started while runs with different limits overlap may thus inherit
+    the limit of the other run, which their initializer corrects only if ``threadpoolctl``
+    is installed.
+    """
+    with _thread_env_lock:
+        if not _thread_env_limits:
+            _thread_env_saved.update({name: os.environ.get(name) for name in _THREAD_ENV_VARS})
+        _thread_env_limits.append(threads)
+        os.environ.update(dict.fromkeys(_THREAD_ENV_VARS, str(threads)))
+    try:
+        yield
+    finally:
+        with _thread_env_lock:
+            _thread_env_limits.remove(threads)
+            if _thread_env_limits:
+                os.environ.update(dict.fromkeys(_THREAD_ENV_VARS, str(_thread_env_limits[-1])))
+            else:
+                for name, value in _thread_env_saved.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+                _thread_env_saved.clear()
+
+
+def _limit_threads(threads: Optional[int]) -> None:
+    """
+    Limit BLAS/OpenMP threads in the current process. Thread pools of libraries already
+    loaded are limited with ``threadpoolctl`` if it is installed.
+    """
+    if threads is None:
+        return
+    os.environ.update(dict.fromkeys(_THREAD_ENV_VARS, str(threads)))
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def _initialize_worker(max_cached_models: int, threads: Optional[int] = None) -> None:
+    """
+    Set the number of model objects kept alive and the number of threads
+    in a worker process.
+    """
+    global _max_cached_models
+    _max_cached_models = max_cached_models
+    _limit_threads(threads)
+
+
+def _get_model(pkg_name: str) -> "ModelObject":
+    """
+    Return a model object, reusing the least recently used cache in worker processes.
+    """
+    from biomass import create_model
+
+    if _max_cached_models <= 0:
+        return create_model(pkg_name)
+    if pkg_name in _models:
+        _models.move_to_end(pkg_name)
+    else:
+        _models[pkg_name] = create_model(pkg_name)
+        while len(_models) > _max_cached_models:
+            _models.popitem(last=False)
+    return _models[pkg_name]
+
+
+@contextmanager
+def _time_limit(timeout: Optional[float]) -> Iterator[None]:
+    """
+    Raise :class:`TimeoutError` if the block runs longer than ``timeout`` seconds.
+
+    The block is interrupted by ``SIGALRM``, so the limit has no effect on platforms without it
+    or outside the main thread, and takes effect only once a running C extension call returns.
+    """
+    if (
+        timeout is None
+        or not hasattr(signal, "SIGALRM")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def handler(signum, frame):
+        raise TimeoutError(f"Timed out after {timeout} s")
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _run_chunk(
+    func: Callable[[str], None], patients: List[str], timeout: Optional[float] = None
+) -> List[Tuple[str, float, Optional[str]]]:
+    """
+    Execute ``func`` for each patient in a chunk and measure elapsed time.
+    An exception raised by a patient is returned as a formatted traceback instead of
+    aborting the rest of the chunk.
+    """
+    results = []
+    for patient in patients:
+        start = time.perf_counter()
+        error = None
+        try:
+            with _time_limit(timeout):
+                func(patient)
+        except Exception:
+            error = traceback.format_exc()
+        results.append((patient, time.perf_counter() - start, error))
+    return results
+
+
+_shared_models: "OrderedDict[str, ModelObject]" = OrderedDict()
+
+
+def _get_shared_model(pkg_name: str, path: str, sources: str) -> "ModelObject":
+    """
+    Return a model object located at ``path``, sharing the network among packages
+    with identical source files.
+
+    Only the first package with given sources is imported and built; models of the other
+    packages are shallow copies of it pointing to their own directory, so that
+    optimized parameter sets and simulation results are read from and written to there.
+    """
+    from biomass import create_model
+
+    if sources in _shared_models:
+        _shared_models.move_to_end(sources)
+    else:
+        _shared_models[sources] = create_model(pkg_name)
+        while len(_shared_models) > max(_max_cached_models, 1):
+            _shared_models.popitem(last=False)
+    model = copy.copy(_shared_models[sources])
+    model._path = path
+    return model
+
+
+@dataclass
+class PatientOverlay(object):
+    """
+    Lightweight record of a patient simulated with a base model package.
+
+    Instead of a full copy of the model package, each patient is a directory containing
+    ``overlay.json`` and the optimized parameter sets in ``out/``.
+    Simulation results are written to the same directory.
+
+    Attributes
+    ----------
+    sample : str
+        CCLE_ID or TCGA_ID of the patient in the transcriptomic data.
+
+    parameters : Dict[str, float]
+        Values of parameters overriding optimized ones.
+
+    initial_conditions : Dict[str, float]
+        Initial values of species overriding optimized ones.
+
+    Examples
+    --------
+    >>> from pasmopy import PatientModelSimulations, PatientOverlay
+    >>> PatientOverlay("TCGA_3C_AALK_01A").write("models/breast/TCGA_3C_AALK_01A")
+    >>> simulations = PatientModelSimulations(
+    ...     "models.breast", ["TCGA_3C_AALK_01A"], base_model="models.erbb_network"
+    ... )
+    """
+
+    sample: str
+    parameters: Dict[str, float] = field(default_factory=dict)
+    initial_conditions: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def read(cls, dirname: str) -> "PatientOverlay":
+        """
+        Read ``overlay.json`` in ``dirname``.
+        If the file does not exist, the name of the directory is used as ``sample``.
+        """
+        path = os.path.join(dirname, "overlay.json")
+        if not os.path.isfile(path):
+            return cls(os.path.basename(os.path.normpath(dirname)))
+        with open(path, mode="r", encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def write(self, dirname: str) -> None:
+        """
+        Write ``overlay.json`` in ``dirname``.
+        """
+        os.makedirs(dirname, exist_ok=True)
+        with open(os.path.join(dirname, "overlay.json"), mode="w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=4)
+
+    def apply(self, model: "ModelObject") -> "ModelObject":
+        """
+        Return a copy of ``model`` whose parameter and initial values are overridden.
+        """
+        for name in self.parameters:
+            if name not in model.parameters:
+                raise NameError(f"{name} is not defined in model parameters.")
+        for name in self.initial_conditions:
+            if name not in model.species:
+                raise NameError(f"{name} is not defined in model species.")
+        model = copy.copy(model)
+        if not self.parameters and not self.initial_conditions:
+            return model
+        idx_params = {model.parameters.index(name): val for name, val in self.parameters.items()}
+        idx_species = {
+            model.species.index(name): val for name, val in self.initial_conditions.items()
+        }
+
+        def override(values: list, indices: Dict[int, float]) -> list:
+            values = list(values)
+            for i, val in indices.items():
+                values[i] = val
+            return values
+
+        pval, ival, load_param = model.pval, model.ival, model.load_param
+        model.pval = lambda: override(pval(), idx_params)
+        model.ival = lambda: override(ival(), idx_species)
+        model.load_param = lambda paramset: type(load_param(paramset))(
+            *(
+                override(values, indices)
+                for values, indices in zip(load_param(paramset), [idx_params, idx_species])
+            )
+        )
+        return model
+
+
+@contextmanager
+def _open_patient_model(
+    path_to_models: str, base_model: Optional[str], patient: str
+) -> Iterator["ModelObject"]:
+    """
+    Model object of a patient, with gene expression levels of the patient
+    incorporated while the context is active.
+    """
+    if base_model is None:
+        yield _get_model(".".join([path_to_models, patient.strip()]))
+    else:
+        path = os.path.join(path_to_models.replace(".", os.sep), patient.strip())
+        overlay = PatientOverlay.read(path)
+        model = overlay.apply(_get_shared_model(base_model, path, base_model))
+        with Individualization.patient(overlay.sample):
+            yield model
+
+
+class _SimulationLayout(NamedTuple):
+    """
+    Observables, conditions and time points of simulation results saved in ``path``:
+    all that reading them requires of a model object.
+    """
+
+    path: str
+    observables: List[str]
+    conditions: List[str]
+    t: np.ndarray
+
+    @classmethod
+    def of(cls, model: "ModelObject") -> "_SimulationLayout":
+        """
+        Layout of simulation results of a model object.
+        """
+        return cls(
+            model.path,
+            list(model.observables),
+            list(model.problem.conditions),
+            np.asarray(model.problem.t, dtype=float),
+        )
+
+    @classmethod
+    def read(cls, path: str) -> Optional["_SimulationLayout"]:
+        """
+        Layout recorded in ``simulation_data/manifest.json`` of a patient-specific model,
+        or :obj:`None` if it is not recorded.
+        """
+        try:
+            with open(
+                os.path.join(path, "simulation_data", "manifest.json"), mode="r", encoding="utf-8"
+            ) as f:
+                manifest = json.load(f)
+            return cls(
+                path,
+                manifest["observables"],
+                manifest["conditions"],
+                np.asarray(manifest["t"], dtype=float),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def to_dict(self) -> dict:
+        """
+        Layout to record in ``simulation_data/manifest.json``.
+        """
+        return {
+            "observables": self.observables,
+            "conditions": self.conditions,
+            "t": self.t.tolist(),
+        }
+
+
+def _simulation_layout(
+    path_to_models: str, base_model: Optional[str], patient: str
+) -> _SimulationLayout:
+    """
+    Layout of simulation results of a patient. It is read from the manifest written with
+    the results, without importing BioMASS, unless they were simulated otherwise.
+    """
+    layout = _SimulationLayout.read(
+        os.path.join(path_to_models.replace(".", os.sep), patient.strip())
+    )
+    if layout is None:
+        with _open_patient_model(path_to_models, base_model, patient) as model:
+            layout = _SimulationLayout.of(model)
+    return layout
+
+
+def _extract_single_patient(
+    path_to_models: str,
+    base_model: Optional[str],
+    dynamical_features: Dict[str, Dict[str, List[str]]],
+    normalization: dict,
+    patient: str,
+) -> Tuple[str, Dict[str, Dict[str, np.ndarray]], np.ndarray]:
+    """
+    Load time courses of a single patient used for extraction in one pass,
+    together with time points of the simulation.
+
+    Worker processes receive only the arguments of this function, not response
+    characteristics, which may not be picklable (e.g., lambdas or locally defined functions).
+    """
+    time_courses: Dict[str, Dict[str, np.ndarray]] = {}
+    layout = _simulation_layout(path_to_models, base_model, patient)
+    for obs_name, conditions_and_metrics in dynamical_features.items():
+        data = PatientModelSimulations._load_simulations(layout, obs_name)
+        if obs_name in normalization.keys():
+            data = PatientModelSimulations._normalize(
+                data, layout.conditions, obs_name, normalization
+            )
+        else:
+            # Average over parameter sets, as normalized results are.
+            data = np.nanmean(data, axis=0)
+        time_courses[obs_name] = {
+            condition: data[layout.conditions.index(condition)]
+            for condition in conditions_and_metrics
+        }
+    return patient, time_courses, layout.t
+
+
+class PatientResult(NamedTuple):
+    """
+    Result of a single patient-specific model execution.
+
+    Attributes
+    ----------
+    patient : str
+        Patient's name or identifier.
+
+    status : Literal["done", "skipped", "failed"]
+        'skipped' if the patient was up to date and not executed,
+        'failed' if the execution raised an exception or timed out in every attempt.
+
+    elapsed : float
+        Computation time in seconds.
+
+    outputs : List[str]
+        Paths to the files written.
+
+    data : numpy.ndarray, optional
+        Memory-mapped contents of the main output file, if requested.
+
+    error : str, optional
+        Traceback of the last attempt if the patient failed.
+    """
+
+    patient: str
+    status: Literal["done", "skipped", "failed"]
+    elapsed: float
+    outputs: List[str]
+    data: Optional[np.ndarray] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class WorkerPool(object):
+    """
+    Reusable pool of worker processes keeping constructed models alive.
+
+    While a pool is open as a context manager, all runs of :class:`PatientModelSimulations`
+    and :class:`PatientModelAnalyses` are executed with its workers,
+    and each worker keeps up to ``max_cached_models`` patient-specific model objects.
+    Models are cached by package name, so modifications of model files made while the pool
+    is open are not reflected.
+
+    Attributes
+    ----------
+    n_proc : int, optional
+        The number of worker processes to use. By default, the number of CPUs available
+        (respecting CPU affinity and cgroup quota) minus one, divided by
+        ``threads_per_worker``.
+
+    context : Literal["spawn", "fork", "forkserver"] (default: "spawn")
+        The context used for starting the worker processes.
+
+    max_cached_models : int (default: 32)
+        The maximum number of model objects cached in each worker process.
+
+    maxtasksperchild : int, optional
+        The number of tasks a worker process completes before it is replaced with a fresh
+        one, releasing cached models and imported patient packages.
+        If :obj:`None`, workers live as long as the pool.
+
+    threads_per_worker : int, optional
+        The maximum number of BLAS/OpenMP threads in each worker process.
+        If :obj:`None`, available CPUs are divided evenly among workers.
+        See :class:`~pasmopy.patient_model.InSilico` for how the limit is applied.
+
+    Examples
+    --------
+    >>> from pasmopy import PatientModelAnalyses, PatientModelSimulations
+    >>> simulations = PatientModelSimulations("models.breast", TCGA_ID)
+    >>> analyses = PatientModelAnalyses("models.breast", TCGA_ID)
+    >>> with simulations.executor(n_proc=8):
+    ...     simulations.run()
+    ...     analyses.run()
+    """
+
+    n_proc: Optional[int] = field(default=None)
+    context: Literal["spawn", "fork", "forkserver"] = field(default="spawn")
+    max_cached_models: int = field(default=32)
+    maxtasksperchild: Optional[int] = field(default=None)
+    threads_per_worker: Optional[int] = field(default=None)
+
+    def __post_init__(self) -> None:
+        if self.n_proc is None:
+            self.n_proc = _default_n_proc(self.threads_per_worker)
+        InSilico._check_ctx(self.context)
+        self._pool = None
+        self._previous: Optional[WorkerPool] = None
+        self._env = ExitStack()
+
+    def start(self) -> None:
+        """
+        Start worker processes.
+        """
+        if self._pool is None:
+            ctx = multiprocessing.get_context(self.context)
+            threads = _threads_per_worker(self.n_proc, self.threads_per_worker)
+            self._env = ExitStack()
+            self._env.enter_context(_thread_env(threads))
+            self._pool = ctx.Pool(
+                processes=self.n_proc,
+                initializer=_initialize_worker,
+                initargs=(self.max_cached_models, threads),
+                maxtasksperchild=self.maxtasksperchild,
+            )
+
+    def close(self) -> None:
+        """
+        Wait for the pending tasks and terminate worker processes.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            self._env.close()
+
+    def imap_unordered(
+        self,
+        func: Callable[[str], None],
+        iterable: Iterable[str],
+        chunksize: int = 1,
+    ) -> Iterator:
+        """
+        Apply ``func`` to each element in ``iterable`` with the worker processes.
+        """
+        self.start()
+        return self._pool.imap_unordered(func, iterable, chunksize)
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        self._previous = InSilico._executor
+        InSilico._executor = self
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        InSilico._executor = self._previous
+        self._previous = None
+        self.close()
 
 
 @dataclass
@@ -25,10 +639,49 @@ class InSilico(object):
 
     patients : list of strings
         List of patients' names or identifiers.
+
+    biomass_kws : dict, optional
+        Keyword arguments to pass to BioMASS, see subclasses.
+
+    base_model : str, optional
+        Path (dot-separated) to a model package shared by all patients.
+        If given, each patient in ``path_to_models`` is a :class:`PatientOverlay`
+        directory rather than a copy of the model package,
+        and the base model is imported only once per process.
+
+    timeout : float, optional
+        Wall-clock limit in seconds for executing a single patient.
+        A patient exceeding it fails with :class:`TimeoutError` and its worker moves on
+        to the next one. The limit relies on ``SIGALRM`` and is not enforced on Windows.
+
+    retries : int (default: 0)
+        The number of times a failed patient is executed again.
+
+    maxtasksperchild : int, optional
+        The number of tasks a worker process completes before it is replaced with a fresh
+        one, capping memory held by imported patient packages. If :obj:`None`, workers
+        live as long as the pool. Not used if a :class:`WorkerPool` is open or an executor
+        is passed to ``arun()``. Asynchronous runs with it require Python 3.11 or later.
+
+    threads_per_worker : int, optional
+        The maximum number of BLAS/OpenMP threads in each worker process, passed through
+        ``OMP_NUM_THREADS`` and similar environment variables, which are set in the main
+        process while workers are running, and applied with ``threadpoolctl`` if it is
+        installed. With the 'fork' context, workers inherit thread pools already loaded
+        in the main process, so the limit requires ``threadpoolctl``.
+        If :obj:`None`, available CPUs are divided evenly among workers.
+        Not used if a :class:`WorkerPool` is open.
     """
 
     path_to_models: str
     patients: List[str]
+    biomass_kws: Optional[dict] = field(default=None)
+    base_model: Optional[str] = field(default=None)
+    timeout: Optional[float] = field(default=None)
+    retries: int = field(default=0)
+    maxtasksperchild: Optional[int] = field(default=None)
+    threads_per_worker: Optional[int] = field(default=None)
+    _executor: ClassVar[Optional[WorkerPool]] = None
 
     def __post_init__(self) -> None:
         """
@@ -38,12 +691,186 @@ class InSilico(object):
         if duplicate:
             raise NameError(f"Duplicate patient: {', '.join(duplicate)}")
 
+    def _path_to_patient(self, patient: str) -> str:
+        """
+        Path to the directory of a patient-specific model.
+        """
+        return os.path.join(self.path_to_models.replace(".", os.sep), patient.strip())
+
+    def _open_model(self, patient: str) -> ContextManager["ModelObject"]:
+        """
+        Model object of a patient, with gene expression levels of the patient
+        incorporated while the context is active.
+        """
+        return _open_patient_model(self.path_to_models, self.base_model, patient)
+
+    @property
+    def _ledger(self) -> str:
+        """
+        Path to the file recording the computation time of each patient-specific model.
+        """
+        return os.path.join(self.path_to_models.replace(".", os.sep), "runtime.json")
+
+    def _read_ledger(self) -> Dict[str, float]:
+        """
+        Return computation time of each patient recorded in previous runs.
+        """
+        try:
+            with open(self._ledger, mode="r", encoding="utf-8") as f:
+                return json.load(f).get(self.__class__.__name__, {})
+        except (OSError, ValueError, AttributeError):
+            # Missing or unreadable, e.g., written by an older version or corrupted.
+            return {}
+
+    def _write_ledger(self, elapsed_time: Dict[str, float]) -> None:
+        """
+        Record computation time of each patient.
+        """
+        ledger: Dict[str, Dict[str, float]] = {}
+        try:
+            with open(self._ledger, mode="r", encoding="utf-8") as f:
+                ledger = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if not isinstance(ledger, dict):
+            ledger = {}
+        ledger.setdefault(self.__class__.__name__, {}).update(elapsed_time)
+        # Written to a temporary file and moved into place, so that a run killed while
+        # writing leaves the previous ledger intact.
+        dirname = os.path.dirname(self._ledger)
+        fd, tmpfile = tempfile.mkstemp(dir=dirname or None, suffix=".json")
+        try:
+            with os.fdopen(fd, mode="w", encoding="utf-8") as f:
+                json.dump(ledger, f, indent=4)
+            os.replace(tmpfile, self._ledger)
+        finally:
+            if os.path.exists(tmpfile):
+                os.remove(tmpfile)
+
+    def _schedule(self, patients: List[str], n_proc: int) -> List[List[str]]:
+        """
+        Split patients into chunks, longest expected computation time first.
+
+        Patients without records are assumed to be as expensive as the slowest one.
+        Patients are then packed into chunks whose total expected time does not exceed
+        a quarter of the average load of a worker, so that cheap models are dispatched
+        together while expensive ones are dispatched alone and early.
+        """
+        ledger = self._read_ledger()
+        default = max(ledger.values()) if ledger else 1.0
+        cost = {patient: ledger.get(patient, default) for patient in patients}
+        target = sum(cost.values()) / (4 * max(n_proc, 1))
+        chunks: List[List[str]] = []
+        chunk_cost = 0.0
+        for patient in sorted(patients, key=lambda p: cost[p], reverse=True):
+            if chunks and chunk_cost + cost[patient] <= target:
+                chunks[-1].append(patient)
+                chunk_cost += cost[patient]
+            else:
+                chunks.append([patient])
+                chunk_cost = cost[patient]
+        return chunks
+
+    def _chunks(
+        self, patients: List[str], n_proc: int, schedule: Literal["fifo", "cost"]
+    ) -> List[List[str]]:
+        """
+        Split patients into chunks dispatched to worker processes.
+        """
+        if schedule not in (schedules := ["fifo", "cost"]):
+            raise ValueError("schedule must be one of '{}'.".format("', '".join(schedules)))
+        if schedule == "fifo":
+            return [[patient] for patient in patients]
+        return self._schedule(patients, n_proc)
+
+    def _imap_unordered(
+        self,
+        func: Callable,
+        iterable: Iterable,
+        n_proc: int,
+        method: Literal["spawn", "fork", "forkserver"],
+    ) -> Iterator:
+        """
+        Apply ``func`` to each element in ``iterable`` in parallel,
+        using the open :class:`WorkerPool` if any.
+        """
+        if InSilico._executor is not None:
+            yield from InSilico._executor.imap_unordered(func, iterable)
+            return
+
+        ctx = multiprocessing.get_context(method)
+        threads = _threads_per_worker(n_proc, self.threads_per_worker)
+        with _thread_env(threads):
+            p = ctx.Pool(
+                processes=n_proc,
+                initializer=_initialize_worker,
+                initargs=(0, threads),
+                maxtasksperchild=self.maxtasksperchild,
+            )
+            try:
+                yield from p.imap_unordered(func, iterable)
+            except GeneratorExit:
+                # The caller stopped iterating: do not leave workers running.
+                p.terminate()
+                raise
+            finally:
+                p.close()
+
+    def _execute(
+        self,
+        func: Callable[[str], None],
+        n_proc: int,
+        method: Literal["spawn", "fork", "forkserver"],
+        progress: bool,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        patients: Optional[List[str]] = None,
+    ) -> Iterator[Tuple[str, float, Optional[str]]]:
+        """
+        Execute multiple models in parallel, yielding each patient, its computation time
+        and traceback (:obj:`None` on success) as soon as it finishes.
+        Failed patients are executed again up to ``self.retries`` times before they are
+        yielded. See :meth:`parallel_execute` for parameters.
+        """
+        from tqdm import tqdm
+
+        if InSilico._executor is not None:
+            n_proc = InSilico._executor.n_proc
+        if patients is None:
+            patients = self.patients
+        if not patients:
+            return
+        chunks = self._chunks(patients, n_proc, schedule)
+        elapsed_time: Dict[str, float] = {}
+        with tqdm(total=len(patients), disable=not progress) as t:
+            try:
+                for attempt in range(self.retries + 1):
+                    failed = []
+                    for result in self._imap_unordered(
+                        partial(_run_chunk, func, timeout=self.timeout), chunks, n_proc, method
+                    ):
+                        for patient, elapsed, error in result:
+                            if error is None:
+                                elapsed_time[patient] = elapsed
+                            elif attempt < self.retries:
+                                failed.append(patient)
+                                continue
+                            t.update()
+                            yield patient, elapsed, error
+                    if not failed:
+                        break
+                    chunks = [[patient] for patient in failed]
+            finally:
+                if schedule == "cost" and elapsed_time:
+                    self._write_ledger(elapsed_time)
+
     def parallel_execute(
         self,
         func: Callable[[str], None],
         n_proc: int,
         method: Literal["spawn", "fork", "forkserver"],
         progress: bool,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        patients: Optional[List[str]] = None,
     ) -> None:
         """
         Execute multiple models in parallel.
@@ -61,16 +888,268 @@ class InSilico(object):
 
         progress : bool
             Whether the progress bar is animating or not.
+
+        schedule : Literal["fifo", "cost"] (default: "fifo")
+            * 'fifo' : Patients are dispatched in list order.
+            * 'cost' : Patients are dispatched longest-expected-first in adaptive chunks,
+              based on computation time recorded in ``runtime.json`` next to the models.
+
+        patients : list of strings, optional
+            Patients to execute. If :obj:`None`, all patients in ``self.patients``.
+
+        Raises
+        ------
+        RuntimeError
+            If any patient failed. The other patients are executed before it is raised.
+
+        Notes
+        -----
+        If a :class:`WorkerPool` is open (see :meth:`executor`), its workers are used
+        and ``n_proc`` and ``method`` are ignored.
         """
+        self._check_failures(
+            {
+                patient: error
+                for patient, _, error in self._execute(
+                    func, n_proc, method, progress, schedule, patients
+                )
+                if error is not None
+            }
+        )
 
-        ctx = multiprocessing.get_context(method)
-        p = ctx.Pool(processes=n_proc)
-        try:
-            with tqdm(total=len(self.patients), disable=not progress) as t:
-                for _ in p.imap_unordered(func, self.patients):
-                    t.update(1)
-        finally:
-            p.close()
+    @staticmethod
+    def _check_failures(failures: Dict[str, str]) -> None:
+        """
+        Raise an error reporting the last line of the traceback of each failed patient.
+        """
+        if failures:
+            raise RuntimeError(
+                f"{len(failures)} patient(s) failed:\n"
+                + "\n".join(
+                    f"  {patient}: {error.strip().splitlines()[-1]}"
+                    for patient, error in failures.items()
+                )
+            )
+
+    @staticmethod
+    def _failure(patient: str, elapsed: float, error: str) -> PatientResult:
+        """
+        Record of a failed patient-specific model execution.
+        """
+        return PatientResult(patient, "failed", elapsed, [], error=error)
+
+    async def _aexecute(
+        self,
+        func: Callable[[str], None],
+        n_proc: int,
+        method: Literal["spawn", "fork", "forkserver"],
+        schedule: Literal["fifo", "cost"] = "fifo",
+        patients: Optional[List[str]] = None,
+        executor: Optional[Executor] = None,
+    ) -> AsyncIterator[Tuple[str, float, Optional[str]]]:
+        """
+        Execute multiple models with a process executor without blocking the event loop,
+        yielding each patient, its computation time and traceback as soon as it finishes.
+        Failed patients are resubmitted up to ``self.retries`` times.
+
+        If ``executor`` is :obj:`None`, a :class:`~concurrent.futures.ProcessPoolExecutor`
+        with ``n_proc`` workers is created and shut down at the end.
+        When the iteration is cancelled or stopped, patients that have not started
+        are cancelled.
+        """
+        if patients is None:
+            patients = self.patients
+        loop = asyncio.get_running_loop()
+        # The ledger is read and written in a thread, not to block the event loop.
+        chunks = await loop.run_in_executor(None, self._chunks, patients, n_proc, schedule)
+        if not chunks:
+            return
+        owner = executor is None
+        threads = _threads_per_worker(n_proc, self.threads_per_worker)
+        run_chunk = partial(_run_chunk, func, timeout=self.timeout)
+        with ExitStack() as env:
+            if executor is None:
+                # The environment is left to the caller who supplies the executor.
+                env.enter_context(_thread_env(threads))
+                kwargs = {}
+                if self.maxtasksperchild is not None:
+                    if sys.version_info < (3, 11):
+                        raise ValueError(
+                            "maxtasksperchild requires Python 3.11 or later for asynchronous "
+                            "runs. Pass an executor or set maxtasksperchild to None."
+                        )
+                    kwargs["max_tasks_per_child"] = self.maxtasksperchild
+                executor = ProcessPoolExecutor(
+                    max_workers=n_proc,
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=_initialize_worker,
+                    initargs=(0, threads),
+                    **kwargs,
+                )
+            # Worker processes are started on submission.
+            pending = {loop.run_in_executor(executor, run_chunk, chunk) for chunk in chunks}
+            attempts = dict.fromkeys(patients, 0)
+            elapsed_time: Dict[str, float] = {}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        for patient, elapsed, error in future.result():
+                            if error is None:
+                                elapsed_time[patient] = elapsed
+                            elif attempts[patient] < self.retries:
+                                attempts[patient] += 1
+                                pending.add(loop.run_in_executor(executor, run_chunk, [patient]))
+                                continue
+                            yield patient, elapsed, error
+            finally:
+                for future in pending:
+                    future.cancel()
+                if owner:
+                    executor.shutdown(wait=False)
+                if schedule == "cost" and elapsed_time:
+                    await loop.run_in_executor(None, self._write_ledger, elapsed_time)
+
+    def _split(self, skip: bool) -> Tuple[List[str], List[str]]:
+        """
+        Split patients into those to skip and those to execute.
+        """
+        return [], self.patients
+
+    def _on_done(self, patient: str, elapsed: float) -> None:
+        """
+        Record a patient executed successfully.
+        """
+
+    def _result(
+        self, patient: str, status: Literal["done", "skipped"], elapsed: float, load: bool
+    ) -> PatientResult:
+        """
+        Record of a patient-specific model execution.
+        """
+        raise NotImplementedError
+
+    def _run_iter(
+        self,
+        func: Callable[[str], None],
+        n_proc: Optional[int],
+        context: Literal["spawn", "fork", "forkserver"],
+        progress: bool,
+        schedule: Literal["fifo", "cost"],
+        skip: bool,
+        load: bool,
+    ) -> Iterator[PatientResult]:
+        """
+        Execute patients not skipped by :meth:`_split`, yielding skipped patients first
+        and the others as soon as they finish.
+        """
+        if n_proc is None:
+            n_proc = _default_n_proc(self.threads_per_worker)
+        self._check_ctx(context)
+        skipped, patients = self._split(skip)
+        for patient in skipped:
+            yield self._result(patient, "skipped", 0.0, load)
+        for patient, elapsed, error in self._execute(
+            func, n_proc, context, progress, schedule, patients
+        ):
+            if error is None:
+                self._on_done(patient, elapsed)
+                yield self._result(patient, "done", elapsed, load)
+            else:
+                yield self._failure(patient, elapsed, error)
+
+    async def _arun_iter(
+        self,
+        func: Callable[[str], None],
+        n_proc: Optional[int],
+        context: Literal["spawn", "fork", "forkserver"],
+        schedule: Literal["fifo", "cost"],
+        skip: bool,
+        load: bool,
+        executor: Optional[Executor],
+    ) -> AsyncIterator[PatientResult]:
+        """
+        Asynchronous version of :meth:`_run_iter`.
+        """
+        if n_proc is None:
+            n_proc = _default_n_proc(self.threads_per_worker)
+        self._check_ctx(context)
+        loop = asyncio.get_running_loop()
+        # Files are read and written in a thread, not to block the event loop.
+        skipped, patients = await loop.run_in_executor(None, self._split, skip)
+        for patient in skipped:
+            yield await loop.run_in_executor(None, self._result, patient, "skipped", 0.0, load)
+        async for patient, elapsed, error in self._aexecute(
+            func, n_proc, context, schedule, patients, executor
+        ):
+            if error is None:
+                await loop.run_in_executor(None, self._on_done, patient, elapsed)
+                yield await loop.run_in_executor(
+                    None, self._result, patient, "done", elapsed, load
+                )
+            else:
+                yield self._failure(patient, elapsed, error)
+
+    async def arun(
+        self,
+        n_proc: Optional[int] = None,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        **kwargs,
+    ) -> List[PatientResult]:
+        """
+        Run multiple patient-specific models without blocking the event loop.
+        Cancelling the awaiting task cancels patients that have not started.
+
+        Parameters are the same as ``arun_iter()`` of :class:`PatientModelSimulations`
+        and :class:`PatientModelAnalyses`, except ``load``.
+
+        Returns
+        -------
+        results : List[:class:`PatientResult`]
+            Results in order of completion, including failed patients.
+        """
+        return [result async for result in self.arun_iter(n_proc, context, **kwargs)]
+
+    @staticmethod
+    def executor(
+        n_proc: Optional[int] = None,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        max_cached_models: int = 32,
+        maxtasksperchild: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+    ) -> WorkerPool:
+        """
+        Create a reusable pool of worker processes.
+
+        Use the returned :class:`WorkerPool` as a context manager: runs of any
+        patient-specific models inside the ``with`` block share warm workers and models.
+
+        Parameters
+        ----------
+        n_proc : int, optional
+            The number of worker processes to use. By default, the number of CPUs
+            available (respecting CPU affinity and cgroup quota) minus one,
+            divided by ``threads_per_worker``.
+
+        context : Literal["spawn", "fork", "forkserver"] (default: "spawn")
+            The context used for starting the worker processes.
+
+        max_cached_models : int (default: 32)
+            The maximum number of model objects cached in each worker process.
+
+        maxtasksperchild : int, optional
+            The number of tasks a worker process completes before it is replaced.
+
+        threads_per_worker : int, optional
+            The maximum number of BLAS/OpenMP threads in each worker process.
+
+        Returns
+        -------
+        pool : :class:`WorkerPool`
+        """
+        return WorkerPool(n_proc, context, max_cached_models, maxtasksperchild, threads_per_worker)
 
     @staticmethod
     def _check_ctx(context: str) -> None:
@@ -81,6 +1160,15 @@ class InSilico(object):
             raise ValueError("context must be one of '{}'.".format("', '".join(contexts)))
 
 
+class Subtypes(NamedTuple):
+    """
+    Response characteristics (patients x features) and cluster labels of patients.
+    """
+
+    features: pd.DataFrame
+    labels: Optional[pd.Series]
+
+
 @dataclass
 class PatientModelSimulations(InSilico):
     """
@@ -93,37 +1181,166 @@ class PatientModelSimulations(InSilico):
 
     response_characteristics : dict[str, Callable[[1d-array], int ot float]]
         A dictionary containing functions to extract dynamic response characteristics
-        from time-course simulations.
+        from time-course simulations. Functions declared with
+        :func:`~pasmopy.response_characteristics.vectorized` are applied to
+        the time courses of all patients at once. Built-in characteristics are
+        'max', 'AUC', 'final_value', 'time_to_peak', 'half_life', 'duration'
+        (above half of the maximum) and 'sustained_ratio' (final / maximum value).
+        Functions with a ``t`` parameter, e.g., 'AUC', receive time points of
+        the simulation (``problem.t``).
+
+    base_model, timeout, retries, maxtasksperchild, threads_per_worker
+        Execution options, see :class:`InSilico`.
     """
 
-    biomass_kws: Optional[dict] = field(default=None)
     response_characteristics: Dict[str, Callable[[np.ndarray], Union[int, float]]] = field(
         default_factory=lambda: dict(
-            max=np.max,
-            AUC=simpson,
+            max=maximum,
+            AUC=auc,
+            final_value=final_value,
+            time_to_peak=time_to_peak,
+            half_life=half_life,
+            duration=duration,
+            sustained_ratio=sustained_ratio,
         ),
         init=False,
     )
 
-    def _run_single_patient(self, patient: str) -> None:
+    def _get_biomass_kws(self) -> dict:
+        """
+        Keyword arguments to pass to ``biomass.run_simulation``, with defaults.
+        """
+        kwargs = self.biomass_kws
+        if kwargs is None:
+            kwargs = {}
+        kwargs.setdefault("viz_type", "average")
+        kwargs.setdefault("stdev", True)
+        return kwargs
+
+    def _sources(self, patient: str) -> str:
+        """
+        Identify source files of a patient-specific model.
+        """
+        path = (
+            self._path_to_patient(patient)
+            if self.base_model is None
+            else self.base_model.replace(".", os.sep)
+        )
+        sources = hashlib.sha256()
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(
+                d
+                for d in dirnames
+                if d not in ("__pycache__", "out", "simulation_data") and not d.startswith(".")
+            )
+            rel = os.path.relpath(dirpath, path)
+            for filename in sorted(filenames):
+                if filename.endswith(".py"):
+                    sources.update(f"{rel}/{filename}".encode())
+                    with open(os.path.join(dirpath, filename), mode="rb") as f:
+                        sources.update(f.read())
+        if self.base_model is not None:
+            sources.update(
+                json.dumps(asdict(PatientOverlay.read(self._path_to_patient(patient)))).encode()
+            )
+        return sources.hexdigest()
+
+    def _inputs(self, patient: str) -> str:
+        """
+        Identify inputs of a patient-specific model simulation.
+
+        The fingerprint covers the model source files, modification time and size of
+        the optimized parameter sets in ``out/{n}/`` and options passed to BioMASS.
+        """
+        inputs = hashlib.sha256(repr(sorted(self._get_biomass_kws().items())).encode())
+        inputs.update(self._sources(patient).encode())
+        out = os.path.join(self._path_to_patient(patient), "out")
+        if os.path.isdir(out):
+            for paramset in sorted(d for d in os.listdir(out) if d.isdecimal()):
+                for filename in sorted(os.listdir(os.path.join(out, paramset))):
+                    stat = os.stat(os.path.join(out, paramset, filename))
+                    inputs.update(
+                        f"{paramset}/{filename}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+                    )
+        return inputs.hexdigest()
+
+    def _manifest(self, patient: str) -> str:
+        """
+        Path to the file recording inputs of the latest simulation.
+        """
+        return os.path.join(self._path_to_patient(patient), "simulation_data", "manifest.json")
+
+    def _simulations(self, patient: str) -> Optional[str]:
+        """
+        Path to the simulated values saved by BioMASS, which depends on ``viz_type``:
+        ``simulations_original.npy`` (observables x conditions x time) for 'original',
+        none for 'experiment' and ``simulations_all.npy`` otherwise.
+        """
+        viz_type = self._get_biomass_kws()["viz_type"]
+        if viz_type == "experiment":
+            return None
+        return os.path.join(
+            self._path_to_patient(patient),
+            "simulation_data",
+            "simulations_original.npy" if viz_type == "original" else "simulations_all.npy",
+        )
+
+    def _is_fresh(self, patient: str) -> bool:
+        """
+        Whether simulation results are up to date with their inputs.
+        """
+        path = self._simulations(patient)
+        if (path is not None and not os.path.isfile(path)) or not os.path.isfile(
+            self._manifest(patient)
+        ):
+            return False
+        with open(self._manifest(patient), mode="r", encoding="utf-8") as f:
+            return json.load(f).get("inputs") == self._inputs(patient)
+
+    def _split(self, incremental: bool) -> Tuple[List[str], List[str]]:
+        """
+        Split patients into those up to date and those to simulate.
+        """
+        if not incremental:
+            return [], self.patients
+        fresh, remaining = [], []
+        for patient in self.patients:
+            (fresh if self._is_fresh(patient) else remaining).append(patient)
+        return fresh, remaining
+
+    def _run_single_patient(self, patient: str, share_network: bool = False) -> None:
         """
         Run a single patient-specifc model simulation.
         """
+        from biomass import run_simulation
 
-        kwargs = self.biomass_kws
-        if kwargs is None:
-            kwargs = {}
-        kwargs.setdefault("viz_type", "average")
-        kwargs.setdefault("stdev", True)
+        kwargs = self._get_biomass_kws()
+        inputs = self._inputs(patient)
 
-        model = create_model(".".join([self.path_to_models, patient.strip()]))
-        run_simulation(model, **kwargs)
+        if share_network and self.base_model is None:
+            model = _get_shared_model(
+                ".".join([self.path_to_models, patient.strip()]),
+                self._path_to_patient(patient),
+                self._sources(patient),
+            )
+            with Individualization.patient(patient.strip()):
+                run_simulation(model, **kwargs)
+        else:
+            with self._open_model(patient) as model:
+                run_simulation(model, **kwargs)
+        os.makedirs(os.path.dirname(self._manifest(patient)), exist_ok=True)
+        with open(self._manifest(patient), mode="w", encoding="utf-8") as f:
+            json.dump({"inputs": inputs, **_SimulationLayout.of(model).to_dict()}, f, indent=4)
 
     def run(
         self,
         n_proc: Optional[int] = None,
         context: Literal["spawn", "fork", "forkserver"] = "spawn",
         progress: bool = True,
+        *,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        incremental: bool = False,
+        share_network: bool = False,
     ) -> None:
         """
         Run simulations of multiple patient-specific models in parallel.
@@ -131,38 +1348,170 @@ class PatientModelSimulations(InSilico):
         Parameters
         ----------
         n_proc : int, optional
-            The number of worker processes to use.
+            The number of worker processes to use. By default, the number of CPUs
+            available (respecting CPU affinity and cgroup quota) minus one,
+            divided by ``threads_per_worker``.
 
         context : Literal["spawn", "fork", "forkserver"] (default: "spawn")
             The context used for starting the worker processes.
 
         progress : bool (default: :obj:`True`)
             If :obj:`True`, the progress indicator will be shown.
+
+        schedule : Literal["fifo", "cost"] (default: "fifo")
+            If 'cost', patients expected to take longest (according to computation time
+            recorded in previous 'cost' runs) are dispatched first, and cheap ones are
+            dispatched together in chunks.
+
+        incremental : bool (default: :obj:`False`)
+            If :obj:`True`, only patients whose model source files, parameter sets in ``out/``
+            or ``biomass_kws`` changed since the last simulation are simulated.
+            Inputs of each simulation are recorded in ``simulation_data/manifest.json``,
+            always written together with the observables, conditions and time points
+            of the results, from which they are read back without BioMASS.
+
+        share_network : bool (default: :obj:`False`)
+            If :obj:`True`, each worker process imports and builds a model only once
+            for all patient packages with identical source files (e.g., copies of
+            a template), then simulates each patient by swapping its parameter sets
+            in ``out/`` and its gene expression levels. The name of each package
+            must be the id of the patient in the transcriptomic data.
+            Models are always shared if ``base_model`` is given.
+
+        Raises
+        ------
+        RuntimeError
+            If any patient failed (see ``timeout`` and ``retries``).
+            The other patients are simulated before it is raised.
         """
-        if n_proc is None:
-            n_proc = multiprocessing.cpu_count() - 1
-        self._check_ctx(context)
-        self.parallel_execute(self._run_single_patient, n_proc, context, progress)
+        self._check_failures(
+            {
+                result.patient: result.error
+                for result in self.run_iter(
+                    n_proc,
+                    context,
+                    progress,
+                    schedule=schedule,
+                    incremental=incremental,
+                    share_network=share_network,
+                )
+                if result.status == "failed"
+            }
+        )
 
-    @staticmethod
-    def _cleanup_csv(dirname: str) -> None:
+    def _result(
+        self, patient: str, status: Literal["done", "skipped"], elapsed: float, load: bool
+    ) -> PatientResult:
+        """
+        Record of a patient-specific model simulation.
+        """
+        path = self._simulations(patient)
+        if path is None:
+            return PatientResult(patient, status, elapsed, [self._manifest(patient)])
+        return PatientResult(
+            patient,
+            status,
+            elapsed,
+            [path, self._manifest(patient)],
+            np.load(path, mmap_mode="r") if load else None,
+        )
+
+    def run_iter(
+        self,
+        n_proc: Optional[int] = None,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        progress: bool = False,
+        *,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        incremental: bool = False,
+        share_network: bool = False,
+        load: bool = False,
+    ) -> Iterator[PatientResult]:
+        """
+        Run simulations of multiple patient-specific models in parallel,
+        yielding the result of each patient as soon as it finishes.
+
+        Parameters are the same as :meth:`run`, except:
+
+        Parameters
+        ----------
+        progress : bool (default: :obj:`False`)
+            If :obj:`True`, the progress indicator will be shown.
+
+        load : bool (default: :obj:`False`)
+            If :obj:`True`, ``data`` of each result holds memory-mapped simulated values:
+            ``simulations_all.npy`` (observables x paramsets x conditions x time), or
+            ``simulations_original.npy`` (observables x conditions x time) if ``viz_type``
+            is 'original'. Nothing is loaded if ``viz_type`` is 'experiment'.
+
+        Yields
+        ------
+        result : :class:`PatientResult`
+            Patients skipped by ``incremental`` are yielded first.
+
+        Examples
+        --------
+        >>> for result in simulations.run_iter():
+        ...     akt = simulations.read_simulations(result.patient, "Phosphorylated_Akt")
+        """
+        return self._run_iter(
+            partial(self._run_single_patient, share_network=share_network),
+            n_proc,
+            context,
+            progress,
+            schedule,
+            incremental,
+            load,
+        )
+
+    def arun_iter(
+        self,
+        n_proc: Optional[int] = None,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        *,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        incremental: bool = False,
+        share_network: bool = False,
+        load: bool = False,
+        executor: Optional[Executor] = None,
+    ) -> AsyncIterator[PatientResult]:
         """
-        Delete CSV files in folder.
+        Asynchronous version of :meth:`run_iter`.
+
+        Parameters are the same as :meth:`run_iter`, except:
 
         Parameters
         ----------
-        dirname: str
-            Name of the directory.
+        executor : concurrent.futures.Executor, optional
+            Process executor to submit patients to, e.g., one shared by several cohorts.
+            If :obj:`None`, a :class:`~concurrent.futures.ProcessPoolExecutor` with
+            ``n_proc`` workers is created for this run. :class:`WorkerPool` is not used.
+
+        Yields
+        ------
+        result : :class:`PatientResult`
+
+        Examples
+        --------
+        >>> async def main():
+        ...     async for result in simulations.arun_iter(n_proc=4):
+        ...         print(result.patient, result.elapsed)
+        >>> asyncio.run(main())
         """
-        files = os.listdir(dirname)
-        for file in files:
-            if file.endswith(".csv"):
-                os.remove(os.path.join(dirname, f"{file}"))
+        return self._arun_iter(
+            partial(self._run_single_patient, share_network=share_network),
+            n_proc,
+            context,
+            schedule,
+            incremental,
+            load,
+            executor,
+        )
 
     @staticmethod
     def _normalize(
         data: np.ndarray,
-        patient_specific: ModelObject,
+        all_conditions: List[str],
         obs_name: str,
         normalization: dict,
     ) -> np.ndarray:
@@ -173,8 +1522,8 @@ class PatientModelSimulations(InSilico):
         ----------
         data : numpy.ndarray
             Raw simulation results.
-        patient_specific : biomass.model_object.ModelObject
-            Patient-specific model object.
+        all_conditions : List[str]
+            Simulation conditions of the patient-specific model.
         obs_name : str
             Observable name.
         normalization : dict
@@ -185,91 +1534,297 @@ class PatientModelSimulations(InSilico):
         data : numpy.ndarray
             Normalized simulation results.
         """
-        if not normalization[obs_name]["condition"]:
-            normalization[obs_name]["condition"] = patient_specific.problem.conditions
-        for i in range(data.shape[0]):
-            if not np.isnan(data[i]).all() and not np.all(data[i] == 0.0):
-                data[i] /= (
-                    data[i][
-                        [
-                            patient_specific.problem.conditions.index(c)
-                            for c in normalization[obs_name]["condition"]
-                        ],
-                        normalization[obs_name]["timepoint"],
-                    ]
-                    if normalization[obs_name]["timepoint"] is not None
-                    else np.nanmax(
-                        data[i][
-                            [
-                                patient_specific.problem.conditions.index(c)
-                                for c in normalization[obs_name]["condition"]
-                            ],
-                        ]
-                    )
-                )
+        # The caller's normalization is left unchanged, so that it identifies the same
+        # extraction settings when it is reused.
+        conditions = normalization[obs_name]["condition"] or all_conditions
+        idx_conditions = [all_conditions.index(c) for c in conditions]
+        timepoint = normalization[obs_name]["timepoint"]
+        # Parameter sets whose simulations failed (all NaN) or vanished (all zero)
+        # are left untouched.
+        valid = ~(np.isnan(data).all(axis=(1, 2)) | np.all(data == 0.0, axis=(1, 2)))
+        if valid.any():
+            if timepoint is not None:
+                denominator = np.max(data[valid][:, idx_conditions, timepoint], axis=1)
+            else:
+                denominator = np.nanmax(data[valid][:, idx_conditions], axis=(1, 2))
+            data[valid] /= denominator[:, np.newaxis, np.newaxis]
         data = np.nanmean(data, axis=0)
-        norm_max: float = np.max(
-            data[
-                [
-                    patient_specific.problem.conditions.index(c)
-                    for c in normalization[obs_name]["condition"]
-                ],
-            ]
-        )
+        norm_max: float = np.max(data[idx_conditions])
         if normalization[obs_name]["timepoint"] is None and norm_max != 0.0:
             data /= norm_max
         return data
 
+    @staticmethod
+    def _load_simulations(
+        layout: _SimulationLayout,
+        obs_name: str,
+        condition: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Read simulated values of an observable from ``simulations_all.npy``.
+
+        The file is memory-mapped and only the requested slab is read into memory.
+        """
+        all_data = np.load(
+            os.path.join(
+                layout.path,
+                "simulation_data",
+                "simulations_all.npy",
+            ),
+            mmap_mode="r",
+        )
+        if condition is None:
+            return np.array(all_data[layout.observables.index(obs_name)])
+        return np.array(
+            all_data[
+                layout.observables.index(obs_name),
+                :,
+                layout.conditions.index(condition),
+            ]
+        )
+
+    def read_simulations(
+        self,
+        patient: str,
+        obs_name: str,
+        condition: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Read simulation results of a patient-specific model.
+
+        Parameters
+        ----------
+        patient : str
+            Patient's name or identifier.
+
+        obs_name : str
+            Observable name.
+
+        condition : str, optional
+            Simulation condition. If :obj:`None`, all conditions are returned.
+
+        Returns
+        -------
+        data : numpy.ndarray
+            Simulated time courses with all estimated parameter sets,
+            (paramsets x conditions x time) or (paramsets x time) if ``condition`` is given.
+        """
+        return self._load_simulations(
+            _simulation_layout(self.path_to_models, self.base_model, patient), obs_name, condition
+        )
+
+    @staticmethod
+    def _stack(
+        time_courses: List[np.ndarray], times: List[np.ndarray]
+    ) -> Tuple[Union[np.ndarray, List[np.ndarray]], Union[np.ndarray, List[np.ndarray]]]:
+        """
+        Stack 1d time courses on the same time points into a (patients x time) array.
+        """
+        if (
+            time_courses
+            and all(
+                time_course.ndim == 1 and time_course.shape == time_courses[0].shape
+                for time_course in time_courses
+            )
+            and all(np.array_equal(t, times[0]) for t in times)
+        ):
+            return np.stack(time_courses), times[0]
+        return time_courses, times
+
+    @staticmethod
+    def _apply_metric(
+        func: Callable,
+        time_courses: Union[np.ndarray, List[np.ndarray]],
+        t: Union[np.ndarray, List[np.ndarray]],
+    ) -> np.ndarray:
+        """
+        Apply a response characteristic to time courses of all patients.
+
+        Vectorized functions are called once on stacked time courses;
+        otherwise, time courses are processed one by one.
+        Functions accepting ``t`` receive the time points of the simulations.
+        """
+        if isinstance(time_courses, np.ndarray):
+            if is_vectorized(func):
+                kwargs = dict(t=t) if uses_time(func) else {}
+                return np.asarray(func(time_courses, axis=-1, **kwargs), dtype=float)
+            t = [t] * len(time_courses)
+        return np.array(
+            [
+                func(time_course, **(dict(t=t_i) if uses_time(func) else {}))
+                for time_course, t_i in zip(time_courses, t)
+            ],
+            dtype=float,
+        )
+
+    def _fingerprint(self, patient: str) -> str:
+        """
+        Identify simulation results of a patient by modification time and size.
+        """
+        try:
+            stat = os.stat(
+                os.path.join(
+                    self._path_to_patient(patient), "simulation_data", "simulations_all.npy"
+                )
+            )
+        except FileNotFoundError:
+            return ""
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    @staticmethod
+    def _identify(func: Callable) -> Optional[str]:
+        """
+        Identify a response characteristic by its module and qualified name, or
+        :obj:`None` if it cannot be told apart from a modified version of itself
+        (lambdas, locally defined functions and instances of callable classes).
+
+        :func:`functools.partial` objects are identified by their function
+        and arguments.
+        """
+        if isinstance(func, partial):
+            name = PatientModelSimulations._identify(func.func)
+            arguments = repr((func.args, sorted(func.keywords.items())))
+            # Objects represented by their memory address differ in every process.
+            if name is None or " at 0x" in arguments:
+                return None
+            return f"{name}{arguments}"
+        qualname = getattr(func, "__qualname__", None)
+        if qualname is None or "<" in qualname:
+            return None
+        return f"{getattr(func, '__module__', '')}.{qualname}"
+
+    def _spec(
+        self, dynamical_features: Dict[str, Dict[str, List[str]]], normalization: dict
+    ) -> Optional[str]:
+        """
+        Identify extraction settings: features, normalization and functions of metrics.
+        :obj:`None` if any metric cannot be identified (see :meth:`_identify`).
+        """
+        metrics = {
+            metric
+            for conditions_and_metrics in dynamical_features.values()
+            for metrics in conditions_and_metrics.values()
+            for metric in metrics
+        }
+        response_characteristics = {
+            metric: self._identify(self.response_characteristics[metric])
+            for metric in sorted(metrics)
+        }
+        if None in response_characteristics.values():
+            return None
+        spec = {
+            "dynamical_features": dynamical_features,
+            "normalization": {
+                obs_name: normalization[obs_name]
+                for obs_name in dynamical_features
+                if obs_name in normalization
+            },
+            "response_characteristics": response_characteristics,
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
     def _extract(
         self,
         dynamical_features: Dict[str, Dict[str, List[str]]],
         normalization: dict,
         progress: bool,
-    ) -> None:
+        n_proc: int = 1,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        incremental: bool = False,
+        output_dir: Optional[str] = "classification",
+    ) -> pd.DataFrame:
         """
         Extract response characteristics from patient-specific signaling dynamics.
+
+        Each patient's simulation results are loaded once and all observables are processed
+        in the same pass. Patients are processed by the open :class:`WorkerPool`, if any,
+        or by ``n_proc`` worker processes when ``n_proc`` > 1.
+        Each response characteristic is then applied to the time courses of all patients,
+        on the time points of the simulations (``problem.t``).
+        Unless ``output_dir`` is :obj:`None`, the result is saved to
+        ``{output_dir}/features.npz`` (see :class:`FeatureStore`) together with
+        fingerprints of the simulation results and extraction settings.
+        If ``incremental`` is :obj:`True`, rows whose fingerprints are unchanged are reused.
+
+        Returns
+        -------
+        characteristics : pandas.DataFrame
+            Response characteristics indexed by ``Sample``
+            with (observable, condition, metric) columns.
         """
-        os.makedirs("classification", exist_ok=True)
-        self._cleanup_csv("classification")
+        from tqdm import tqdm
+
+        if output_dir is None and incremental:
+            raise ValueError("output_dir is required to reuse response characteristics.")
+        store = (
+            None if output_dir is None else FeatureStore(os.path.join(output_dir, "features.npz"))
+        )
+        spec = self._spec(dynamical_features, normalization)
+        fingerprints = {patient: self._fingerprint(patient) for patient in self.patients}
+        columns = pd.MultiIndex.from_tuples(
+            [
+                (obs_name, condition, metric)
+                for obs_name, conditions_and_metrics in dynamical_features.items()
+                for condition, metrics in conditions_and_metrics.items()
+                for metric in metrics
+            ],
+            names=["observable", "condition", "metric"],
+        )
+        stored = pd.DataFrame(columns=columns, dtype=float)
+        if incremental and store is not None and store.exists():
+            stored_spec, stored_fingerprints = store.read_fingerprints()
+            if spec is not None and stored_spec == spec:
+                stored = store.read()
+                stored = stored.loc[
+                    [
+                        patient
+                        for patient in self.patients
+                        if patient in stored.index
+                        and fingerprints[patient]
+                        and stored_fingerprints.get(patient) == fingerprints[patient]
+                    ]
+                ]
+        patients = [patient for patient in self.patients if patient not in stored.index]
+        func = partial(
+            _extract_single_patient,
+            self.path_to_models,
+            self.base_model,
+            dynamical_features,
+            normalization,
+        )
+        results: Dict[str, Dict[str, Dict[str, np.ndarray]]] = {}
+        times: Dict[str, np.ndarray] = {}
+        with tqdm(total=len(patients), disable=not progress) as pbar:
+            for patient, time_courses, t in (
+                self._imap_unordered(func, patients, n_proc, context)
+                if patients and (InSilico._executor is not None or n_proc > 1)
+                else map(func, patients)
+            ):
+                results[patient] = time_courses
+                times[patient] = t
+                pbar.update(1)
+        values = np.empty((len(patients), len(columns)))
+        i = 0
         for obs_name, conditions_and_metrics in dynamical_features.items():
-            with open(
-                os.path.join("classification", f"{obs_name}.csv"),
-                "w",
-                newline="",
-            ) as f:
-                writer = csv.writer(f)
-                header = ["Sample"]
-                for condition, metrics in conditions_and_metrics.items():
-                    for metric in metrics:
-                        header.append(f"{condition}_{metric}")
-                writer.writerow(header)
-
-                for patient in tqdm(self.patients, disable=not progress):
-                    patient_specific = create_model(
-                        ".".join([self.path_to_models, patient.strip()])
-                    )
-                    all_data = np.load(
-                        os.path.join(
-                            patient_specific.path,
-                            "simulation_data",
-                            "simulations_all.npy",
-                        )
-                    )
-                    data = np.array(all_data[patient_specific.observables.index(obs_name)])
-                    if obs_name in normalization.keys():
-                        data = self._normalize(data, patient_specific, obs_name, normalization)
-                    patient_specific_characteristics = [patient]
-                    for h in header[1:]:
-                        condition, metric = h.split("_")
-                        patient_specific_characteristics.append(
-                            str(
-                                self.response_characteristics[metric](
-                                    data[patient_specific.problem.conditions.index(condition)],
-                                )
-                            )
+            for condition, metrics in conditions_and_metrics.items():
+                time_courses, t = self._stack(
+                    [results[patient][obs_name][condition] for patient in patients],
+                    [times[patient] for patient in patients],
+                )
+                for metric in metrics:
+                    if patients:
+                        values[:, i] = self._apply_metric(
+                            self.response_characteristics[metric], time_courses, t
                         )
-                    writer = csv.writer(f, lineterminator="\n")
-                    writer.writerow(patient_specific_characteristics)
+                    i += 1
+        extracted = pd.DataFrame(values, index=pd.Index(patients, name="Sample"), columns=columns)
+        if not stored.empty:
+            stored = stored.reindex(columns=columns)
+            extracted = pd.concat([stored, extracted]).loc[self.patients]
+        extracted.index.name = "Sample"
+        if store is not None:
+            store.write(extracted, fingerprints, spec or "")
+        return extracted
 
     def subtyping(
         self,
@@ -279,7 +1834,12 @@ class PatientModelSimulations(InSilico):
         progress: bool = True,
         *,
         clustermap_kws: Optional[dict] = None,
-    ):
+        n_proc: int = 1,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        incremental: bool = False,
+        clustering: Optional[Clustering] = None,
+        output_dir: str = "classification",
+    ) -> Optional[pd.Series]:
         """
         Classify patients based on dynamic characteristics extracted from simulation results.
 
@@ -300,12 +1860,44 @@ class PatientModelSimulations(InSilico):
                 The experimental conditions to use for normalization.
                 If empty, all conditions defined in ``sim.conditions`` will be used.
 
+            Simulated values of observables not given here are averaged over
+            parameter sets without normalization.
+
         progress : bool (default: :obj:`True`)
             If :obj:`True`, the progress indicator will be shown.
 
         clustermap_kws : dict, optional
             Keyword arguments to pass to ``seaborn.clustermap()``.
 
+        n_proc : int (default: 1)
+            The number of worker processes used to extract response characteristics.
+            Ignored if a :class:`WorkerPool` is open, in which case its workers are used.
+
+        context : Literal["spawn", "fork", "forkserver"] (default: "spawn")
+            The context used for starting the worker processes.
+
+        incremental : bool (default: :obj:`False`)
+            If :obj:`True`, response characteristics saved in ``{output_dir}/features.npz``
+            are reused for patients whose ``simulations_all.npy`` (modification time and size)
+            and extraction settings (features, normalization and metrics) are unchanged,
+            and only the other patients are processed. Metrics are identified by their
+            module and qualified name, and by arguments for :func:`functools.partial`;
+            all patients are processed again if a metric is a lambda, a locally defined
+            function or an instance of a callable class.
+
+        clustering : :class:`~pasmopy.clustering.Clustering`, optional
+            If given, patients are assigned to clusters with it instead of
+            ``seaborn.clustermap()``, and a heatmap sorted by cluster,
+            downsampled to at most 1000 patients, is saved as fname.
+
+        output_dir : str (default: "classification")
+            Directory where response characteristics are saved as ``features.npz``.
+
+        Returns
+        -------
+        labels : pandas.Series or :obj:`None`
+            Cluster labels indexed by patient if ``clustering`` is given.
+
         Examples
         --------
         Subtype classification
@@ -335,6 +1927,23 @@ class PatientModelSimulations(InSilico):
         >>> def get_droprate(time_course: np.ndarray) -> float:
         ...     return - (time_course[-1] - np.max(time_course)) / (len(time_course) - np.argmax(time_course))
         >>> simulations.response_characteristics["droprate"] = get_droprate
+
+        Characteristics computed on all patients at once
+
+        >>> from pasmopy.response_characteristics import vectorized
+        >>> @vectorized
+        ... def get_final_value(time_course: np.ndarray, axis: int = -1) -> np.ndarray:
+        ...     return np.take(time_course, -1, axis=axis)
+        >>> simulations.response_characteristics["final_value"] = get_final_value
+
+        Cluster labels of a large cohort
+
+        >>> from pasmopy.clustering import Clustering
+        >>> labels = simulations.subtyping(
+        ...    "subtypes.pdf",
+        ...    {"Phosphorylated_Akt": {"EGF": ["max", "AUC"], "HRG": ["max", "AUC"]}},
+        ...    clustering=Clustering(4, method="kmeans"),
+        ... )
         """
         if normalization is None:
             normalization = {}
@@ -344,23 +1953,104 @@ class PatientModelSimulations(InSilico):
         clustermap_kws.setdefault("z_score", 1)
         clustermap_kws.setdefault("cmap", "RdBu_r")
         clustermap_kws.setdefault("center", 0)
+        self._check_ctx(context)
         # extract response characteristics
-        self._extract(dynamical_features, normalization, progress)
+        extracted = self._extract(
+            dynamical_features, normalization, progress, n_proc, context, incremental, output_dir
+        )
+        if clustering is not None:
+            labels = clustering.fit_predict(extracted)
+            if fname is not None:
+                clustering.heatmap(extracted, labels, fname)
+            return labels
         if fname is not None:
-            characteristics: List[pd.DataFrame] = []
-            files = os.listdir("classification")
-            for file in files:
-                observable, ext = os.path.splitext(file)
-                if ext == ".csv":
-                    df = pd.read_csv(os.path.join("classification", file), index_col="Sample")
-                    characteristics.append(
-                        df.rename(columns=lambda s: observable.replace("_", " ") + "_" + s)
-                    )
-            all_info = pd.concat(characteristics, axis=1)
+            import seaborn as sns
+
+            all_info = extracted.copy()
+            all_info.columns = [
+                "_".join([observable.replace("_", " "), condition, metric])
+                for observable, condition, metric in extracted.columns
+            ]
             all_info.index.name = ""
             fig = sns.clustermap(all_info, **clustermap_kws)
             fig.savefig(fname)
 
+    def classify(
+        self,
+        dynamical_features: Dict[str, Dict[str, List[str]]],
+        normalization: Optional[dict] = None,
+        clustering: Optional[Clustering] = None,
+        *,
+        progress: bool = False,
+        n_proc: int = 1,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        output_dir: Optional[str] = None,
+        incremental: bool = False,
+    ) -> Subtypes:
+        """
+        Extract response characteristics and assign patients to clusters in memory.
+
+        Unlike :meth:`subtyping`, nothing is drawn and, unless ``output_dir`` is given,
+        nothing is written, so that it can be called concurrently.
+
+        Observables, conditions and time points of simulation results are read from
+        ``simulation_data/manifest.json`` written by :meth:`run`, so that neither BioMASS
+        nor plotting libraries are imported. Patient-specific models are opened with
+        BioMASS only for results simulated otherwise.
+
+        Parameters
+        ----------
+        dynamical_features : Dict[str, Dict[str, List[str]]]
+            ``{"observable": {"condition": ["metric", ...], ...}, ...}``.
+            Characteristics in the signaling dynamics used for classification.
+
+        normalization : dict, optional (default: :obj:`None`)
+            See :meth:`subtyping`.
+
+        clustering : :class:`~pasmopy.clustering.Clustering`, optional
+            If given, patients are assigned to clusters.
+
+        progress : bool (default: :obj:`False`)
+            If :obj:`True`, the progress indicator will be shown.
+
+        n_proc : int (default: 1)
+            The number of worker processes used to extract response characteristics.
+            Ignored if a :class:`WorkerPool` is open, in which case its workers are used.
+
+        context : Literal["spawn", "fork", "forkserver"] (default: "spawn")
+            The context used for starting the worker processes.
+
+        output_dir : str, optional
+            If given, response characteristics are also saved to ``{output_dir}/features.npz``.
+
+        incremental : bool (default: :obj:`False`)
+            See :meth:`subtyping`. Requires ``output_dir``.
+
+        Returns
+        -------
+        subtypes : :class:`Subtypes`
+            Response characteristics and cluster labels (:obj:`None` without ``clustering``).
+
+        Examples
+        --------
+        >>> from pasmopy.clustering import Clustering
+        >>> subtypes = simulations.classify(
+        ...     {"Phosphorylated_Akt": {"EGF": ["max", "AUC"], "HRG": ["max", "AUC"]}},
+        ...     clustering=Clustering(4),
+        ... )
+        >>> subtypes.features
+        >>> subtypes.labels.value_counts()
+        """
+        if normalization is None:
+            normalization = {}
+        self._check_ctx(context)
+        extracted = self._extract(
+            dynamical_features, normalization, progress, n_proc, context, incremental, output_dir
+        )
+        return Subtypes(
+            extracted, None if clustering is None else clustering.fit_predict(extracted)
+        )
+
 
 @dataclass
 class PatientModelAnalyses(InSilico):
@@ -371,31 +2061,138 @@ class PatientModelAnalyses(InSilico):
     ----------
     biomass_kws : dict, optional
         Keyword arguments to pass to ``biomass.run_analysis``.
-    """
 
-    biomass_kws: Optional[dict] = field(default=None)
+    base_model, timeout, retries, maxtasksperchild, threads_per_worker
+        Execution options, see :class:`InSilico`.
 
-    def _run_single_patient(self, patient: str) -> None:
+    Notes
+    -----
+    Each completed (patient, target, metric) analysis is appended to ``analyses.jsonl``
+    next to the models, so that an interrupted run can be resumed with ``resume=True``.
+    """
+
+    def _get_biomass_kws(self) -> dict:
         """
-        Run a single patient-specifc model analysis.
+        Keyword arguments to pass to ``biomass.run_analysis``, with defaults.
         """
-
-        kwargs = self.biomass_kws
-        if kwargs is None:
-            kwargs = {}
+        kwargs = dict(self.biomass_kws) if self.biomass_kws is not None else {}
         kwargs.setdefault("target", "initial_condition")
         kwargs.setdefault("metric", "integral")
         kwargs.setdefault("style", "heatmap")
         kwargs.setdefault("options", None)
+        return kwargs
+
+    def _run_single_patient(self, patient: str) -> None:
+        """
+        Run a single patient-specifc model analysis.
+        """
+        from biomass import run_analysis
+
+        with self._open_model(patient) as model:
+            run_analysis(model, **self._get_biomass_kws())
+
+    def _output(self, patient: str) -> str:
+        """
+        Path to the sensitivity coefficients of a patient.
+        """
+        kwargs = self._get_biomass_kws()
+        return os.path.join(
+            self._path_to_patient(patient),
+            "sensitivity_coefficients",
+            kwargs["target"],
+            f"{kwargs['metric']}.npy",
+        )
+
+    def _result(
+        self, patient: str, status: Literal["done", "skipped"], elapsed: float, load: bool
+    ) -> PatientResult:
+        """
+        Record of a patient-specific model analysis.
+        """
+        path = self._output(patient)
+        return PatientResult(
+            patient, status, elapsed, [path], np.load(path, mmap_mode="r") if load else None
+        )
+
+    @property
+    def _journal(self) -> str:
+        """
+        Path to the file recording completed analyses.
+        """
+        return os.path.join(self.path_to_models.replace(".", os.sep), "analyses.jsonl")
+
+    def _read_journal(self) -> List[Tuple[str, str, str]]:
+        """
+        Return (patient, target, metric) of analyses completed in previous runs.
+        """
+        completed = []
+        if not os.path.isfile(self._journal):
+            return completed
+        with open(self._journal, mode="r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be truncated if the run was killed while writing it.
+                    continue
+                completed.append((entry["patient"], entry["target"], entry["metric"]))
+        return completed
+
+    def _write_journal(self, patient: str, elapsed: float) -> None:
+        """
+        Append a completed analysis to the journal and flush it to disk.
+        """
+        kwargs = self._get_biomass_kws()
+        entry = {
+            "patient": patient,
+            "target": kwargs["target"],
+            "metric": kwargs["metric"],
+            "elapsed": elapsed,
+            "time": time.time(),
+        }
+        with open(self._journal, mode="a+b") as f:
+            # Start a new line if the last one was truncated by preemption.
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            f.write((json.dumps(entry) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _on_done(self, patient: str, elapsed: float) -> None:
+        """
+        Journal a completed analysis.
+        """
+        self._write_journal(patient, elapsed)
 
-        model = create_model(".".join([self.path_to_models, patient.strip()]))
-        run_analysis(model, **kwargs)
+    def _split(self, resume: bool) -> Tuple[List[str], List[str]]:
+        """
+        Split patients into those already analyzed with the current target and metric,
+        and those to analyze.
+        """
+        if not resume:
+            return [], self.patients
+        kwargs = self._get_biomass_kws()
+        journal = set(self._read_journal())
+        completed, remaining = [], []
+        for patient in self.patients:
+            if (patient, kwargs["target"], kwargs["metric"]) in journal and os.path.isfile(
+                self._output(patient)
+            ):
+                completed.append(patient)
+            else:
+                remaining.append(patient)
+        return completed, remaining
 
     def run(
         self,
         n_proc: Optional[int] = None,
         context: Literal["spawn", "fork", "forkserver"] = "spawn",
         progress: bool = True,
+        *,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        resume: bool = False,
     ) -> None:
         """
         Run analyses of multiple patient-specific models in parallel.
@@ -403,15 +2200,95 @@ class PatientModelAnalyses(InSilico):
         Parameters
         ----------
         n_proc : int, optional
-            The number of worker processes to use.
+            The number of worker processes to use. By default, the number of CPUs
+            available (respecting CPU affinity and cgroup quota) minus one,
+            divided by ``threads_per_worker``.
 
         context : Literal["spawn", "fork", "forkserver"] (default: "spawn")
             The context used for starting the worker processes.
 
         progress : bool (default: :obj:`True`)
             If :obj:`True`, the progress indicator will be shown.
+
+        schedule : Literal["fifo", "cost"] (default: "fifo")
+            If 'cost', patients expected to take longest (according to computation time
+            recorded in previous 'cost' runs) are dispatched first, and cheap ones are
+            dispatched together in chunks.
+
+        resume : bool (default: :obj:`False`)
+            If :obj:`True`, patients recorded in ``analyses.jsonl`` as analyzed with
+            the same ``target`` and ``metric``, and whose sensitivity coefficients exist,
+            are skipped, e.g., to continue a run interrupted by preemption.
+
+        Raises
+        ------
+        RuntimeError
+            If any patient failed (see ``timeout`` and ``retries``).
+            The other patients are analyzed before it is raised.
         """
-        if n_proc is None:
-            n_proc = multiprocessing.cpu_count() - 1
-        self._check_ctx(context)
-        self.parallel_execute(self._run_single_patient, n_proc, context, progress)
+        self._check_failures(
+            {
+                result.patient: result.error
+                for result in self.run_iter(
+                    n_proc, context, progress, schedule=schedule, resume=resume
+                )
+                if result.status == "failed"
+            }
+        )
+
+    def run_iter(
+        self,
+        n_proc: Optional[int] = None,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        progress: bool = False,
+        *,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        resume: bool = False,
+        load: bool = False,
+    ) -> Iterator[PatientResult]:
+        """
+        Run analyses of multiple patient-specific models in parallel,
+        yielding the result of each patient as soon as it finishes.
+
+        Parameters are the same as :meth:`run`, except:
+
+        Parameters
+        ----------
+        progress : bool (default: :obj:`False`)
+            If :obj:`True`, the progress indicator will be shown.
+
+        load : bool (default: :obj:`False`)
+            If :obj:`True`, ``data`` of each result holds memory-mapped
+            sensitivity coefficients.
+
+        Yields
+        ------
+        result : :class:`PatientResult`
+            Patients skipped by ``resume`` are yielded first.
+        """
+        return self._run_iter(
+            self._run_single_patient, n_proc, context, progress, schedule, resume, load
+        )
+
+    def arun_iter(
+        self,
+        n_proc: Optional[int] = None,
+        context: Literal["spawn", "fork", "forkserver"] = "spawn",
+        *,
+        schedule: Literal["fifo", "cost"] = "fifo",
+        resume: bool = False,
+        load: bool = False,
+        executor: Optional[Executor] = None,
+    ) -> AsyncIterator[PatientResult]:
+        """
+        Asynchronous version of :meth:`run_iter`.
+        See :meth:`PatientModelSimulations.arun_iter` for ``executor``.
+
+        Yields
+        ------
+        result : :class:`PatientResult`
+            Patients skipped by ``resume`` are yielded first.
+        """
+        return self._arun_iter(
+            self._run_single_patient, n_proc, context, schedule, resume, load, executor
+        )
@@ -0,0 +1,211 @@
+"""
+Dynamic response characteristics extracted from time-course simulations.
+"""
+
+import inspect
+from typing import Callable, Literal, Optional, Tuple, Union
+
+import numpy as np
+
+__all__ = [
+    "vectorized",
+    "is_vectorized",
+    "uses_time",
+    "maximum",
+    "auc",
+    "cumulative_auc",
+    "final_value",
+    "time_to_peak",
+    "half_life",
+    "duration",
+    "sustained_ratio",
+]
+
+
+def vectorized(func: Callable) -> Callable:
+    """
+    Declare that ``func`` accepts an array of time courses and an ``axis`` argument.
+
+    A vectorized characteristic is called once on the time courses of all patients,
+    (patients x time), with ``axis=-1`` and must return one value per patient.
+    Other characteristics are called on each time course.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from pasmopy.response_characteristics import vectorized
+    >>> @vectorized
+    ... def get_droprate(time_course: np.ndarray, axis: int = -1) -> np.ndarray:
+    ...     peak = np.argmax(time_course, axis=axis)
+    ...     return -(
+    ...         np.take(time_course, -1, axis=axis) - np.max(time_course, axis=axis)
+    ...     ) / (time_course.shape[axis] - peak)
+    """
+    func.vectorized = True
+    return func
+
+
+def is_vectorized(func: Callable) -> bool:
+    """
+    Whether ``func`` is declared with :func:`vectorized`.
+    """
+    return getattr(func, "vectorized", False) or getattr(
+        getattr(func, "func", None), "vectorized", False
+    )
+
+
+def uses_time(func: Callable) -> bool:
+    """
+    Whether ``func`` accepts time points of the simulation as ``t``.
+
+    When extracting features, such characteristics receive ``problem.t``
+    of the patient-specific model.
+    """
+    try:
+        return "t" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _time_last(
+    time_course: np.ndarray, axis: int, t: Optional[np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Move the time axis of ``time_course`` to the end and return it with time points.
+    If ``t`` is not given, indices of time points are used.
+    """
+    y = np.moveaxis(np.asarray(time_course, dtype=float), axis, -1)
+    t = np.arange(y.shape[-1], dtype=float) if t is None else np.asarray(t, dtype=float)
+    if t.shape != y.shape[-1:]:
+        raise ValueError(f"Length of t ({t.size}) differs from time courses ({y.shape[-1]}).")
+    return y, t
+
+
+@vectorized
+def maximum(time_course: np.ndarray, axis: int = -1) -> Union[float, np.ndarray]:
+    """
+    Maximum value.
+    """
+    return np.max(time_course, axis=axis)
+
+
+@vectorized
+def auc(
+    time_course: np.ndarray,
+    axis: int = -1,
+    t: Optional[np.ndarray] = None,
+    method: Literal["simpson", "trapezoid"] = "simpson",
+) -> Union[float, np.ndarray]:
+    """
+    Area under the curve.
+
+    Parameters
+    ----------
+    time_course : numpy.ndarray
+        Time courses.
+
+    axis : int (default: -1)
+        Axis of time.
+
+    t : numpy.ndarray, optional
+        Time points. If :obj:`None`, unit spacing is assumed.
+
+    method : Literal["simpson", "trapezoid"] (default: "simpson")
+        Composite Simpson's rule or trapezoidal rule.
+        Use :func:`functools.partial` to select the trapezoidal rule.
+    """
+    from scipy.integrate import simpson, trapezoid
+
+    if method == "simpson":
+        return simpson(time_course, x=t, axis=axis)
+    elif method == "trapezoid":
+        return trapezoid(time_course, x=t, axis=axis)
+    else:
+        raise ValueError("method must be either 'simpson' or 'trapezoid'.")
+
+
+def cumulative_auc(
+    time_course: np.ndarray, axis: int = -1, t: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Area under the curve from the first time point up to each time point
+    (trapezoidal rule), with the same shape as ``time_course``.
+    """
+    from scipy.integrate import cumulative_trapezoid
+
+    return cumulative_trapezoid(time_course, x=t, axis=axis, initial=0)
+
+
+@vectorized
+def final_value(time_course: np.ndarray, axis: int = -1) -> Union[float, np.ndarray]:
+    """
+    Value at the last time point.
+    """
+    return np.take(time_course, -1, axis=axis)
+
+
+@vectorized
+def time_to_peak(
+    time_course: np.ndarray, axis: int = -1, t: Optional[np.ndarray] = None
+) -> Union[float, np.ndarray]:
+    """
+    Time at which the maximum value is reached.
+    """
+    y, t = _time_last(time_course, axis, t)
+    return t[np.argmax(y, axis=-1)]
+
+
+@vectorized
+def half_life(
+    time_course: np.ndarray, axis: int = -1, t: Optional[np.ndarray] = None
+) -> Union[float, np.ndarray]:
+    """
+    Time from the peak until the value first decays to half of the maximum,
+    linearly interpolated between time points.
+    NaN if the value does not decay to half of the maximum.
+    """
+    y, t = _time_last(time_course, axis, t)
+    peak = np.argmax(y, axis=-1)
+    half = np.max(y, axis=-1) / 2
+    decayed = (np.arange(y.shape[-1]) > peak[..., np.newaxis]) & (y <= half[..., np.newaxis])
+    found = decayed.any(axis=-1) & (half > 0)
+    end = np.where(found, np.argmax(decayed, axis=-1), 1)
+    y0 = np.take_along_axis(y, (end - 1)[..., np.newaxis], axis=-1)[..., 0]
+    y1 = np.take_along_axis(y, end[..., np.newaxis], axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing = t[end - 1] + (t[end] - t[end - 1]) * (y0 - half) / (y0 - y1)
+    return np.where(found, crossing - t[peak], np.nan)
+
+
+@vectorized
+def duration(
+    time_course: np.ndarray,
+    axis: int = -1,
+    t: Optional[np.ndarray] = None,
+    threshold: float = 0.5,
+) -> Union[float, np.ndarray]:
+    """
+    Total time during which the value is above ``threshold`` x the maximum,
+    with crossings linearly interpolated between time points.
+    Use :func:`functools.partial` to change ``threshold``.
+    """
+    y, t = _time_last(time_course, axis, t)
+    level = threshold * np.max(y, axis=-1)[..., np.newaxis]
+    y0, y1 = y[..., :-1], y[..., 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.clip((np.maximum(y0, y1) - level) / np.abs(y1 - y0), 0.0, 1.0)
+    fraction = np.where((y0 > level) & (y1 > level), 1.0, fraction)
+    fraction = np.where((y0 <= level) & (y1 <= level), 0.0, fraction)
+    return np.sum(fraction * np.diff(t), axis=-1)
+
+
+@vectorized
+def sustained_ratio(time_course: np.ndarray, axis: int = -1) -> Union[float, np.ndarray]:
+    """
+    Ratio of the final value to the maximum value (sustained / transient).
+    NaN if the maximum value is zero.
+    """
+    y = np.moveaxis(np.asarray(time_course, dtype=float), axis, -1)
+    peak = np.max(y, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peak != 0, y[..., -1] / peak, np.nan)
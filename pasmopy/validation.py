@@ -8,10 +8,8 @@ from dataclasses import dataclass, field
 from typing import Dict, List, NamedTuple, NoReturn, Optional
 from urllib.request import urlopen
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import seaborn as sns
 from scipy.stats import brunnermunzel
 
 
@@ -140,6 +138,8 @@ class CancerCellLineEncyclopedia(object):
         label: str,
         show_individual: bool,
     ):
+        import matplotlib.pyplot as plt
+
         if show_individual:
             for i, _ in enumerate(population):
                 plt.plot(
@@ -225,6 +225,8 @@ class CancerCellLineEncyclopedia(object):
         ...         labels=["EGFR high", "EGFR low"],
         ...     )
         """
+        import matplotlib.pyplot as plt
+
         self._check_args(drug)
 
         os.makedirs(os.path.join("dose_response", f"{self._drug2target(drug)}"), exist_ok=True)
@@ -307,6 +309,9 @@ class CancerCellLineEncyclopedia(object):
         ...         labels=["EGFR high", "EGFR low"],
         ...     )
         """
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+
         self._check_args(drug)
 
         os.makedirs(
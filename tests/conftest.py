@@ -0,0 +1,62 @@
+import os
+import re
+import shutil
+from typing import List, NamedTuple
+
+import numpy as np
+import pytest
+
+TINY_NETWORK = """\
+L binds R <--> LR || R = 1
+LR is phosphorylated --> pLR
+pLR is dephosphorylated --> LR
+
+@obs Phosphorylated_R: u[pLR]
+@obs Bound_R: u[LR] + u[pLR]
+
+@sim tspan: [0, 60]
+@sim condition low: init[L] = 1.0
+@sim condition high: init[L] = 10.0
+"""
+
+
+class Cohort(NamedTuple):
+    path_to_models: str
+    patients: List[str]
+
+
+def write_paramsets(path: str, scale: float) -> None:
+    """
+    Write two parameter sets of the tiny network in ``out/`` of a model package.
+    """
+    shutil.rmtree(os.path.join(path, "out"), ignore_errors=True)
+    for paramset in [1, 2]:
+        out = os.path.join(path, "out", str(paramset))
+        os.makedirs(out)
+        np.save(os.path.join(out, "generation.npy"), 1)
+        np.save(os.path.join(out, "fit_param1.npy"), np.full(6, 0.5 * paramset * scale))
+        np.save(os.path.join(out, "best_fitness.npy"), 0.0)
+
+
+@pytest.fixture
+def tiny_models(tmp_path, monkeypatch) -> Cohort:
+    """
+    Copies of a tiny network as patient-specific models, each with its own parameter sets.
+
+    The working directory is changed to ``tmp_path``, from which the models are importable
+    under a package name unique to the test.
+    """
+    from biomass import Text2Model
+
+    package = re.sub(r"\W", "_", f"cohort_{tmp_path.name}")
+    os.makedirs(tmp_path / package)
+    (tmp_path / package / "__init__.py").touch()
+    (tmp_path / "template.txt").write_text(TINY_NETWORK)
+    Text2Model(str(tmp_path / "template.txt")).convert()
+    patients = ["patient0", "patient1", "patient2"]
+    for i, patient in enumerate(patients):
+        shutil.copytree(tmp_path / "template", tmp_path / package / patient)
+        write_paramsets(str(tmp_path / package / patient), i + 1)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return Cohort(package, patients)
@@ -3,7 +3,14 @@ import shutil
 import time
 from typing import List, Optional
 
-from pasmopy import PatientModelAnalyses, PatientModelSimulations, Text2Model, create_model
+from pasmopy import (
+    FeatureStore,
+    PatientModelAnalyses,
+    PatientModelSimulations,
+    Text2Model,
+    create_model,
+)
+from pasmopy.clustering import Clustering
 from pasmopy.preprocessing import WeightingFactors
 
 from .C import INCORPORATION, INDIVIDUALIZATION, REQUIREMENTS
@@ -179,9 +186,22 @@ def test_patient_model_simulations(
             progress=False,
         )
         obs_names = ["Phosphorylated_Akt", "Phosphorylated_ERK", "Phosphorylated_c-Myc"]
+        features = FeatureStore(os.path.join("classification", "features.npz")).read()
+        assert list(features.index) == TNBC_ID
         for observable in obs_names:
-            assert os.path.isfile(os.path.join("classification", f"{observable}.csv"))
+            assert features[observable].shape == (len(TNBC_ID), 2 * len(dynamical_features))
         assert os.path.isfile("subtype_classification.pdf")
+        # Data-only classification
+        subtypes = simulations.classify(
+            {observable: {"EGF": dynamical_features} for observable in obs_names},
+            {
+                observable: {"timepoint": None, "condition": ["EGF", "HRG"]}
+                for observable in obs_names
+            },
+            Clustering(2),
+        )
+        assert subtypes.features.shape == (len(TNBC_ID), len(obs_names) * len(dynamical_features))
+        assert subtypes.labels.index.tolist() == TNBC_ID
 
 
 def test_patient_model_analyses(exec_model: bool = False):
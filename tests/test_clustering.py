@@ -0,0 +1,47 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pasmopy.clustering import Clustering
+
+
+def make_features(n_per_cluster: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    centers = np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 5.0], [0.0, 10.0, -5.0]])
+    values = np.concatenate(
+        [center + rng.normal(0.0, 0.5, (n_per_cluster, 3)) for center in centers]
+    )
+    return pd.DataFrame(
+        values,
+        index=pd.Index([f"patient{i}" for i in range(len(values))], name="Sample"),
+        columns=pd.MultiIndex.from_tuples(
+            [("Akt", "EGF", "max"), ("Akt", "EGF", "AUC"), ("ERK", "HRG", "max")],
+            names=["observable", "condition", "metric"],
+        ),
+    )
+
+
+@pytest.mark.parametrize("method", ["hierarchical", "kmeans"])
+def test_fit_predict(method: str):
+    features = make_features(200)
+    features.iloc[0, 1] = np.nan
+    labels = Clustering(3, method=method, batch_size=64, random_state=0).fit_predict(features)
+    assert labels.index.equals(features.index)
+    assert set(labels) == {0, 1, 2}
+    # Each group of patients is assigned to a single cluster.
+    groups = np.repeat(np.arange(3), 200)
+    assert all(labels[groups == group].nunique() == 1 for group in range(3))
+
+
+def test_heatmap():
+    features = make_features(50)
+    clustering = Clustering(3, method="kmeans", random_state=0)
+    labels = clustering.fit_predict(features)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for aggregate in [False, True]:
+            fname = os.path.join(tmpdir, f"heatmap_{aggregate}.png")
+            clustering.heatmap(features, labels, fname, max_rows=30, aggregate=aggregate)
+            assert os.path.isfile(fname)
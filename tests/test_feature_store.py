@@ -0,0 +1,40 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pasmopy import FeatureStore
+
+
+def create_features(samples, seed: int = 0) -> pd.DataFrame:
+    return pd.DataFrame(
+        np.random.default_rng(seed).uniform(size=(len(samples), 4)),
+        index=pd.Index(samples, name="Sample"),
+        columns=pd.MultiIndex.from_product(
+            [["Phosphorylated_Akt", "Phosphorylated_ERK"], ["EGF"], ["max", "AUC"]],
+            names=["observable", "condition", "metric"],
+        ),
+    )
+
+
+def test_read_write(tmp_path):
+    store = FeatureStore(os.path.join(str(tmp_path), "classification", "features.npz"))
+    assert not store.exists()
+    features = create_features(["patient1", "patient2"])
+    store.write(features, {"patient1": "a", "patient2": "b"}, "spec")
+    pd.testing.assert_frame_equal(store.read(), features)
+    assert store.read_fingerprints() == ("spec", {"patient1": "a", "patient2": "b"})
+
+
+def test_append(tmp_path):
+    store = FeatureStore(os.path.join(str(tmp_path), "features.npz"))
+    store.write(create_features(["patient1", "patient2"]), {"patient1": "a"}, "spec")
+    updated = create_features(["patient2", "patient3"], seed=1)
+    store.append(updated, {"patient2": "c", "patient3": "d"})
+    features = store.read()
+    assert list(features.index) == ["patient1", "patient2", "patient3"]
+    pd.testing.assert_frame_equal(features.loc[["patient2", "patient3"]], updated)
+    assert store.read_fingerprints() == (
+        "spec",
+        {"patient1": "a", "patient2": "c", "patient3": "d"},
+    )
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ["biomass", "matplotlib", "seaborn", "tqdm"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_pasmopy(statement: str) -> dict:
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} "
+        "if m in sys.modules]}))\n"
+    )
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [os.getcwd(), ROOT, os.environ.get("PYTHONPATH")])
+        ),
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_import_time():
+    for statement in [
+        "import pasmopy",
+        "from pasmopy import Individualization",
+        "import pasmopy.patient_model",
+        "import pasmopy.validation",
+    ]:
+        result = import_pasmopy(statement)
+        print(f"{statement}: {result['elapsed']:.3f} s")
+        assert result["loaded"] == [], f"{statement} imports {', '.join(result['loaded'])}"
+
+
+def test_lazy_biomass_attributes():
+    result = import_pasmopy("from pasmopy import create_model, Text2Model")
+    assert "biomass" in result["loaded"]
+
+
+def test_classify_without_biomass(tiny_models):
+    from pasmopy import PatientModelSimulations
+
+    PatientModelSimulations(*tiny_models).run(n_proc=1, progress=False)
+    result = import_pasmopy(
+        "from pasmopy import PatientModelSimulations\n"
+        f"PatientModelSimulations(*{tuple(tiny_models)!r}).classify("
+        "{'Phosphorylated_R': {'low': ['max']}}, "
+        "{'Phosphorylated_R': {'timepoint': None, 'condition': []}})"
+    )
+    assert not set(result["loaded"]) & {"biomass", "matplotlib", "seaborn"}
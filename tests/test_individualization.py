@@ -0,0 +1,136 @@
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pasmopy import Individualization
+
+GENE_EXPRESSION: Dict[str, List[str]] = {
+    "ErbB1": ["EGFR"],
+    "Shc": ["SHC1", "SHC2"],
+    "DUSP": ["DUSP5", "DUSP6", "DUSP7"],
+}
+PARAMETERS: List[str] = ["V1", "V2"] + [
+    f"w_{gene}" for genes in GENE_EXPRESSION.values() for gene in genes
+]
+SPECIES: List[str] = ["EGF", "ErbB1", "Shc", "DUSP"]
+PATIENTS: List[str] = ["patient1", "patient2", "patient3"]
+
+
+def write_transcriptomic_data(dirname: str) -> str:
+    genes = [gene for genes in GENE_EXPRESSION.values() for gene in genes] + ["GAPDH"]
+    data = pd.DataFrame(
+        np.random.default_rng(0).uniform(0.5, 2.0, (len(genes), len(PATIENTS))),
+        index=pd.Index(genes, name="Description"),
+        columns=PATIENTS,
+    )
+    path = os.path.join(dirname, "transcriptomic_data.csv")
+    data.to_csv(path)
+    return path
+
+
+def create_individualization(transcriptomic_data: str, **kwargs) -> Individualization:
+    return Individualization(
+        parameters=PARAMETERS,
+        species=SPECIES,
+        transcriptomic_data=transcriptomic_data,
+        gene_expression=GENE_EXPRESSION,
+        read_csv_kws={"index_col": "Description"},
+        **kwargs,
+    )
+
+
+def test_weighted_sum(tmp_path):
+    path = write_transcriptomic_data(str(tmp_path))
+    expression_level = pd.read_csv(path, index_col="Description")
+    individualization = create_individualization(path)
+    x = list(np.random.default_rng(1).uniform(0.1, 10.0, len(PARAMETERS)))
+    for patient in PATIENTS:
+        expected = {
+            protein: sum(
+                x[PARAMETERS.index("w_" + gene)] * expression_level.at[gene, patient]
+                for gene in genes
+            )
+            for protein, genes in GENE_EXPRESSION.items()
+        }
+        assert np.isclose(
+            individualization.as_reaction_rate(patient, x, "V2", "DUSP"),
+            x[PARAMETERS.index("V2")] * expected["DUSP"],
+        )
+        y0 = individualization.as_initial_conditions(patient, x, [1.0] * len(SPECIES))
+        assert y0[SPECIES.index("EGF")] == 1.0
+        for protein, value in expected.items():
+            assert np.isclose(y0[SPECIES.index(protein)], value)
+
+
+def test_protein_not_in_species(tmp_path):
+    path = write_transcriptomic_data(str(tmp_path))
+    individualization = Individualization(
+        parameters=PARAMETERS,
+        species=SPECIES[:-1],
+        transcriptomic_data=path,
+        gene_expression=GENE_EXPRESSION,
+        read_csv_kws={"index_col": "Description"},
+    )
+    expected = create_individualization(path)
+    x = np.random.default_rng(3).uniform(0.1, 10.0, len(PARAMETERS))
+    # Proteins incorporated as reaction rates need not be species of the model.
+    assert individualization.as_reaction_rate("patient1", x, "V2", "DUSP") == (
+        expected.as_reaction_rate("patient1", list(x), "V2", "DUSP")
+    )
+    with pytest.raises(ValueError):
+        individualization.as_initial_conditions("patient1", x, [1.0] * (len(SPECIES) - 1))
+
+
+def test_shared_transcriptomic_data(tmp_path):
+    path = write_transcriptomic_data(str(tmp_path))
+    Individualization.clear_cache()
+    individualization1 = create_individualization(path)
+    individualization2 = create_individualization(path)
+    assert individualization1.expression_level is individualization2.expression_level
+    assert "GAPDH" not in individualization1.expression_level.index
+    assert list(individualization1.expression_level.columns) == PATIENTS
+    Individualization.clear_cache()
+    assert create_individualization(path).expression_level is not (
+        individualization1.expression_level
+    )
+
+
+def test_binary_cache(tmp_path):
+    path = write_transcriptomic_data(str(tmp_path))
+    cache_dir = os.path.join(str(tmp_path), "cache")
+    Individualization.clear_cache()
+    expected = create_individualization(path).expression_level
+    for _ in range(2):
+        Individualization.clear_cache()
+        cached = create_individualization(path, cache_dir=cache_dir).expression_level
+        pd.testing.assert_frame_equal(cached, expected, check_index_type=False)
+    assert len([f for f in os.listdir(cache_dir) if f != "sources"]) == 1
+    # A key file read while another process writes it is ignored.
+    sources = os.path.join(cache_dir, "sources")
+    for source in os.listdir(sources):
+        open(os.path.join(sources, source), "w").close()
+    Individualization.clear_cache()
+    cached = create_individualization(path, cache_dir=cache_dir).expression_level
+    pd.testing.assert_frame_equal(cached, expected, check_index_type=False)
+    assert len([f for f in os.listdir(cache_dir) if f != "sources"]) == 1
+    assert len(os.listdir(sources)) == 1
+
+
+def test_memory_map(tmp_path):
+    path = write_transcriptomic_data(str(tmp_path))
+    Individualization.clear_cache()
+    expected = create_individualization(path)
+    individualization = create_individualization(
+        path, cache_dir=os.path.join(str(tmp_path), "cache"), memory_map=True
+    )
+    assert not individualization.expression_level.to_numpy().flags.writeable
+    assert "GAPDH" in individualization.expression_level.index
+    x = list(np.random.default_rng(2).uniform(0.1, 10.0, len(PARAMETERS)))
+    for patient in PATIENTS:
+        assert np.allclose(
+            individualization.as_initial_conditions(patient, x, [1.0] * len(SPECIES)),
+            expected.as_initial_conditions(patient, x, [1.0] * len(SPECIES)),
+        )
@@ -0,0 +1,306 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pytest
+
+from pasmopy import patient_model
+from pasmopy.patient_model import (
+    PatientModelAnalyses,
+    PatientModelSimulations,
+    WorkerPool,
+    _cpu_quota,
+    _default_n_proc,
+    _threads_per_worker,
+)
+
+
+def sleep(patient: str) -> None:
+    time.sleep(0.01 * int(patient[-1]))
+
+
+def fail(patient: str) -> None:
+    if patient == "patient1":
+        raise ValueError(f"{patient} is stiff")
+
+
+def fail_once(dirname: str, patient: str) -> None:
+    marker = os.path.join(dirname, patient)
+    if not os.path.isfile(marker):
+        open(marker, "w").close()
+        raise ValueError(f"{patient} failed")
+
+
+def hang(patient: str) -> None:
+    if patient == "patient1":
+        time.sleep(60)
+
+
+def record_pid(dirname: str, patient: str) -> None:
+    with open(os.path.join(dirname, patient), "w") as f:
+        f.write(str(os.getpid()))
+
+
+def test_aexecute():
+    patients = [f"patient{i}" for i in range(4)]
+    cohort = PatientModelAnalyses("models", patients)
+
+    async def collect():
+        return [patient async for patient, _, _ in cohort._aexecute(sleep, 2, "spawn")]
+
+    assert sorted(asyncio.run(collect())) == patients
+
+    async def first():
+        # Stopping the iteration early cancels remaining patients.
+        async for patient, _, _ in cohort._aexecute(sleep, 1, "spawn"):
+            return patient
+
+    assert asyncio.run(first()) == "patient0"
+
+
+def test_failures():
+    patients = [f"patient{i}" for i in range(4)]
+    cohort = PatientModelAnalyses("models", patients)
+    errors = {patient: error for patient, _, error in cohort._execute(fail, 2, "spawn", False)}
+    assert sorted(errors) == patients
+    assert "ValueError: patient1 is stiff" in errors.pop("patient1")
+    assert all(error is None for error in errors.values())
+    with pytest.raises(RuntimeError, match="patient1: ValueError"):
+        cohort.parallel_execute(fail, 2, "spawn", False)
+
+
+def test_retries():
+    patients = [f"patient{i}" for i in range(3)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        PatientModelAnalyses("models", patients, retries=1).parallel_execute(
+            partial(fail_once, tmpdir), 2, "spawn", False
+        )
+    with tempfile.TemporaryDirectory() as tmpdir:
+
+        async def collect():
+            cohort = PatientModelAnalyses("models", patients, retries=1)
+            return [
+                error
+                async for _, _, error in cohort._aexecute(partial(fail_once, tmpdir), 2, "spawn")
+            ]
+
+        assert asyncio.run(collect()) == [None] * 3
+
+
+def test_timeout():
+    patients = [f"patient{i}" for i in range(3)]
+    cohort = PatientModelAnalyses("models", patients, timeout=1.0)
+    start = time.perf_counter()
+    errors = {patient: error for patient, _, error in cohort._execute(hang, 1, "spawn", False)}
+    assert time.perf_counter() - start < 30
+    assert "TimeoutError" in errors["patient1"]
+    assert errors["patient0"] is None and errors["patient2"] is None
+
+
+def test_maxtasksperchild():
+    patients = [f"patient{i}" for i in range(3)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        PatientModelAnalyses("models", patients, maxtasksperchild=1).parallel_execute(
+            partial(record_pid, tmpdir), 1, "spawn", False
+        )
+        pids = set()
+        for patient in patients:
+            with open(os.path.join(tmpdir, patient)) as f:
+                pids.add(f.read())
+    assert len(pids) == 3
+
+
+def test_worker_pool(tmp_path):
+    patients = [f"patient{i}" for i in range(4)]
+    cohort = PatientModelAnalyses("models", patients)
+    pids = set()
+    with cohort.executor(n_proc=2) as pool:
+        assert isinstance(pool, WorkerPool)
+        workers = {str(process.pid) for process in pool._pool._pool}
+        for run in ["first", "second"]:
+            os.makedirs(tmp_path / run)
+            cohort.parallel_execute(partial(record_pid, str(tmp_path / run)), 4, "spawn", False)
+            pids |= {(tmp_path / run / patient).read_text() for patient in patients}
+    # Worker processes of the pool are reused across runs, whatever n_proc is passed.
+    assert len(workers) == 2 and pids <= workers
+
+
+def test_model_cache(tiny_models, monkeypatch):
+    monkeypatch.setattr(patient_model, "_models", OrderedDict())
+    monkeypatch.setattr(patient_model, "_max_cached_models", 2)
+    path_to_models, patients = tiny_models
+
+    def get_model(patient: str):
+        return patient_model._get_model(".".join([path_to_models, patient]))
+
+    model0 = get_model("patient0")
+    model1 = get_model("patient1")
+    assert get_model("patient0") is model0
+    # The least recently used model is evicted.
+    get_model("patient2")
+    assert list(patient_model._models) == [f"{path_to_models}.patient{i}" for i in [0, 2]]
+    assert get_model("patient1") is not model1
+    # Models are not cached outside worker pools.
+    monkeypatch.setattr(patient_model, "_max_cached_models", 0)
+    assert get_model("patient2") is not get_model("patient2")
+
+
+def test_resume(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    patients = [f"patient{i}" for i in range(3)]
+    analyses = PatientModelAnalyses("models", patients, biomass_kws={"metric": "maximum"})
+    for patient in patients[:2]:
+        path = analyses._output(patient)
+        os.makedirs(os.path.dirname(path))
+        open(path, "w").close()
+    analyses._write_journal("patient0", 1.0)
+    analyses._write_journal("patient2", 1.0)
+    # Another metric and a line truncated by preemption
+    PatientModelAnalyses("models", patients)._write_journal("patient1", 1.0)
+    with open(analyses._journal, "a") as f:
+        f.write('{"patient": "patient1", "tar')
+    # patient2 has no output.
+    assert analyses._split(True) == (["patient0"], ["patient1", "patient2"])
+    assert analyses._split(False) == ([], patients)
+    # An entry appended after the truncated line is read back.
+    analyses._write_journal("patient1", 1.0)
+    assert analyses._split(True) == (["patient0", "patient1"], ["patient2"])
+    # Completed patients are skipped by synchronous and asynchronous runs alike.
+    path = analyses._output("patient2")
+    os.makedirs(os.path.dirname(path))
+    open(path, "w").close()
+    for results in [
+        list(analyses.run_iter(resume=True)),
+        asyncio.run(analyses.arun(resume=True)),
+    ]:
+        assert [(result.patient, result.status) for result in results] == [
+            (patient, "skipped") for patient in patients
+        ]
+
+
+def check_threads(threads: str, patient: str) -> None:
+    # Environment the worker process was started with, before NumPy was imported
+    if os.path.isfile("/proc/self/environ"):
+        with open("/proc/self/environ", "rb") as f:
+            environ = dict(
+                item.decode().split("=", 1) for item in f.read().split(b"\0") if b"=" in item
+            )
+    else:
+        environ = os.environ
+    assert environ.get("OMP_NUM_THREADS") == threads
+
+
+def test_threads_per_worker(tmp_path, monkeypatch):
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    assert _cpu_quota(str(tmp_path)) == 2.5
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert _cpu_quota(str(tmp_path)) is None
+    assert _cpu_quota(str(tmp_path / "missing")) is None
+    monkeypatch.setattr(patient_model, "_available_cpus", lambda: 16)
+    assert _default_n_proc() == 15
+    assert _default_n_proc(4) == 3
+    assert _threads_per_worker(4) == 4
+    assert _threads_per_worker(4, 2) == 2
+    environ = dict(os.environ)
+    cohort = PatientModelAnalyses("models", ["patient0", "patient1"], threads_per_worker=2)
+    cohort.parallel_execute(partial(check_threads, "2"), 2, "spawn", False)
+    # Workers replaced after maxtasksperchild tasks
+    cohort = PatientModelAnalyses(
+        "models", [f"patient{i}" for i in range(4)], maxtasksperchild=1, threads_per_worker=2
+    )
+    cohort.parallel_execute(partial(check_threads, "2"), 1, "spawn", False)
+    with cohort.executor(1, maxtasksperchild=1, threads_per_worker=2):
+        cohort.parallel_execute(partial(check_threads, "2"), 1, "spawn", False)
+    # The environment of the main process is restored.
+    assert os.environ == environ
+
+
+def test_overlapping_thread_limits(monkeypatch):
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    environ = dict(os.environ)
+    first, second = patient_model._thread_env(3), patient_model._thread_env(5)
+    first.__enter__()
+    second.__enter__()
+    # Runs exiting in any order leave the limit of the run still active.
+    first.__exit__(None, None, None)
+    assert os.environ["OMP_NUM_THREADS"] == "5"
+    second.__exit__(None, None, None)
+    assert os.environ == environ
+    patients = [f"patient{i}" for i in range(4)]
+
+    async def collect(threads_per_worker: int, executor=None):
+        cohort = PatientModelAnalyses("models", patients, threads_per_worker=threads_per_worker)
+        return [
+            patient
+            async for patient, _, _ in cohort._aexecute(sleep, 1, "spawn", executor=executor)
+        ]
+
+    async def overlap():
+        return await asyncio.gather(collect(3), collect(5))
+
+    assert [sorted(run) for run in asyncio.run(overlap())] == [patients, patients]
+    assert os.environ == environ
+
+    async def with_executor():
+        # The environment is not changed for an executor supplied by the caller.
+        with ProcessPoolExecutor(1) as executor:
+            async for _ in PatientModelAnalyses("models", patients)._aexecute(
+                sleep, 1, "spawn", executor=executor
+            ):
+                assert os.environ == environ
+
+    asyncio.run(with_executor())
+
+
+def test_amaxtasksperchild():
+    patients = [f"patient{i}" for i in range(3)]
+    cohort = PatientModelAnalyses("models", patients, maxtasksperchild=1)
+
+    async def collect():
+        return [patient async for patient, _, _ in cohort._aexecute(sleep, 1, "spawn")]
+
+    if sys.version_info < (3, 11):
+        with pytest.raises(ValueError, match="Python 3.11"):
+            asyncio.run(collect())
+    else:
+        assert sorted(asyncio.run(collect())) == patients
+
+
+def test_positional_arguments():
+    biomass_kws = {"target": "parameter"}
+    analyses = PatientModelAnalyses("models", ["patient0"], biomass_kws)
+    assert analyses.biomass_kws == biomass_kws and analyses.base_model is None
+    simulations = PatientModelSimulations("models", ["patient0"], biomass_kws, "models.base")
+    assert simulations.biomass_kws == biomass_kws and simulations.base_model == "models.base"
+
+
+def test_schedule(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("models")
+    patients = [f"patient{i}" for i in range(6)]
+    cohort = PatientModelAnalyses("models", patients)
+    # No records: patients are dispatched one by one.
+    assert cohort._schedule(patients, 2) == [[patient] for patient in patients]
+    cohort._write_ledger({"patient0": 8.0, "patient1": 1.0, "patient2": 1.0, "patient3": 1.0})
+    cohort._write_ledger({"patient4": 0.5})
+    assert cohort._read_ledger()["patient0"] == 8.0
+    # patient5 is assumed to be as expensive as the slowest one.
+    chunks = cohort._schedule(patients, 1)
+    assert chunks[:2] == [["patient0"], ["patient5"]]
+    assert sorted(sum(chunks[2:], [])) == ["patient1", "patient2", "patient3", "patient4"]
+    assert all(len(chunk) > 1 for chunk in chunks[2:])
+    # Ledgers of other classes are kept.
+    PatientModelSimulations("models", patients)._write_ledger({"patient0": 2.0})
+    assert cohort._read_ledger()["patient0"] == 8.0
+    # A ledger truncated by a killed run is treated as empty.
+    with open(cohort._ledger, "w") as f:
+        f.write('{"PatientModelAnalyses": {"pat')
+    assert cohort._read_ledger() == {}
+    cohort._write_ledger({"patient0": 3.0})
+    assert cohort._read_ledger() == {"patient0": 3.0}
+    assert os.listdir("models") == ["runtime.json"]
@@ -0,0 +1,285 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pasmopy import PatientModelSimulations, patient_model
+from pasmopy.patient_model import _extract_single_patient
+from pasmopy.response_characteristics import auc
+
+from .conftest import write_paramsets
+
+FEATURES = {
+    "Phosphorylated_R": {"low": ["max", "AUC"], "high": ["max"]},
+    "Bound_R": {"high": ["final_value"]},
+}
+NORMALIZATION = {
+    "Phosphorylated_R": {"timepoint": None, "condition": ["low", "high"]},
+    "Bound_R": {"timepoint": None, "condition": ["high"]},
+}
+
+
+def test_extract_with_local_metric(tiny_models):
+    simulations = PatientModelSimulations(*tiny_models)
+    simulations.run(n_proc=2, progress=False)
+    simulations.response_characteristics["range"] = lambda time_course: np.ptp(time_course)
+    features = dict(FEATURES, Bound_R={"high": ["final_value", "range"]})
+    expected = simulations.classify(features, NORMALIZATION).features
+    assert expected.notna().all().all()
+    # Workers receive neither the simulations object nor its response characteristics.
+    with simulations.executor(n_proc=2):
+        extracted = simulations.classify(features, NORMALIZATION).features
+    assert np.allclose(extracted.to_numpy(), expected.to_numpy())
+    assert np.allclose(extracted[("Bound_R", "high", "range")], 1.0)
+
+
+def test_read_simulations(tiny_models):
+    simulations = PatientModelSimulations(*tiny_models)
+    simulations.run(n_proc=1, progress=False)
+    data = np.load(
+        os.path.join(
+            tiny_models.path_to_models, "patient1", "simulation_data", "simulations_all.npy"
+        )
+    )
+    # Observables and conditions are indexed as they are declared in the model.
+    np.testing.assert_array_equal(simulations.read_simulations("patient1", "Bound_R"), data[1])
+    np.testing.assert_array_equal(
+        simulations.read_simulations("patient1", "Phosphorylated_R", "high"), data[0, :, 1]
+    )
+    assert simulations.read_simulations("patient1", "Bound_R", "low").shape == (2, 61)
+
+
+def test_share_network(tiny_models, monkeypatch):
+    monkeypatch.setattr(patient_model, "_shared_models", OrderedDict())
+    simulations = PatientModelSimulations(*tiny_models)
+
+    def read():
+        return [
+            np.load(
+                os.path.join(
+                    tiny_models.path_to_models, patient, "simulation_data", "simulations_all.npy"
+                )
+            )
+            for patient in tiny_models.patients
+        ]
+
+    for patient in tiny_models.patients:
+        simulations._run_single_patient(patient, share_network=True)
+    # Copies of the template are built only once.
+    assert len(patient_model._shared_models) == 1
+    shared = read()
+    assert not np.allclose(shared[0], shared[1]) and not np.allclose(shared[1], shared[2])
+    # Each patient is simulated with its own parameter sets.
+    simulations.run(n_proc=1, progress=False)
+    for data, expected in zip(shared, read()):
+        np.testing.assert_allclose(data, expected)
+
+
+def test_run_iter(tiny_models):
+    simulations = PatientModelSimulations(*tiny_models)
+    results, finished = [], []
+    for result in simulations.run_iter(n_proc=1):
+        assert result.status == "done" and all(map(os.path.isfile, result.outputs))
+        results.append(result.patient)
+        finished.append(
+            [
+                os.path.isfile(
+                    os.path.join(
+                        tiny_models.path_to_models, patient, "simulation_data", "manifest.json"
+                    )
+                )
+                for patient in tiny_models.patients
+            ]
+        )
+    assert results == tiny_models.patients
+    # Each patient is yielded as soon as it finishes, before the last one is simulated.
+    assert not finished[0][-1]
+
+
+def test_extract_without_normalization(tiny_models):
+    simulations = PatientModelSimulations(*tiny_models)
+    simulations.run(n_proc=1, progress=False)
+    features = simulations.classify(
+        {"Phosphorylated_R": {"low": ["max"]}, "Bound_R": {"high": ["max", "final_value"]}}
+    ).features
+    # Time courses are averaged over parameter sets.
+    for patient in tiny_models.patients:
+        low = simulations.read_simulations(patient, "Phosphorylated_R", "low").mean(axis=0)
+        high = simulations.read_simulations(patient, "Bound_R", "high").mean(axis=0)
+        np.testing.assert_allclose(
+            features.loc[patient].to_numpy(), [low.max(), high.max(), high[-1]]
+        )
+
+
+def test_arun(tiny_models):
+    simulations = PatientModelSimulations(*tiny_models)
+    results = asyncio.run(simulations.arun(n_proc=2, incremental=True))
+    assert sorted(result.patient for result in results) == tiny_models.patients
+    assert {result.status for result in results} == {"done"}
+    for patient in tiny_models.patients:
+        data = np.load(
+            os.path.join(
+                tiny_models.path_to_models, patient, "simulation_data", "simulations_all.npy"
+            )
+        )
+        assert data.shape == (2, 2, 2, 61) and np.isfinite(data).all()
+    # Up-to-date patients are skipped.
+    results = asyncio.run(simulations.arun(n_proc=2, incremental=True))
+    assert {result.status for result in results} == {"skipped"}
+
+
+def test_arun_cancel(tiny_models):
+    simulations = PatientModelSimulations(*tiny_models)
+
+    def output(patient: str) -> str:
+        return os.path.join(
+            tiny_models.path_to_models, patient, "simulation_data", "simulations_all.npy"
+        )
+
+    async def cancel():
+        task = asyncio.create_task(simulations.arun(n_proc=1))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    # Patients already passed to the worker may finish, but the others are not started.
+    deadline = time.time() + 60
+    while not os.path.isfile(output("patient0")) and time.time() < deadline:
+        time.sleep(0.5)
+    time.sleep(5)
+    assert not os.path.isfile(output("patient2"))
+
+
+@pytest.mark.parametrize("viz_type", ["average", "original"])
+def test_incremental_run(tiny_models, viz_type):
+    simulations = PatientModelSimulations(*tiny_models, biomass_kws={"viz_type": viz_type})
+
+    def run():
+        return {
+            result.patient: result
+            for result in simulations.run_iter(n_proc=1, incremental=True, load=True)
+        }
+
+    results = run()
+    assert {result.status for result in results.values()} == {"done"}
+    for result in results.values():
+        assert all(os.path.isfile(output) for output in result.outputs)
+        assert result.data.shape == ((2, 2, 61) if viz_type == "original" else (2, 2, 2, 61))
+    # Up-to-date patients are skipped, and their results are loaded.
+    results = run()
+    assert {result.status for result in results.values()} == {"skipped"}
+    assert all(result.data is not None for result in results.values())
+    # Patients whose parameter sets changed are simulated again.
+    write_paramsets(os.path.join(tiny_models.path_to_models, "patient1"), 4)
+    results = run()
+    assert [patient for patient, result in results.items() if result.status == "done"] == [
+        "patient1"
+    ]
+
+
+def test_incremental_extraction(tiny_models, monkeypatch):
+    simulations = PatientModelSimulations(*tiny_models)
+    simulations.run(n_proc=2, progress=False)
+    extracted = []
+
+    def extract_single_patient(*args):
+        extracted.append(args[-1])
+        return _extract_single_patient(*args)
+
+    monkeypatch.setattr(patient_model, "_extract_single_patient", extract_single_patient)
+    normalization = {obs_name: {"timepoint": None, "condition": []} for obs_name in FEATURES}
+
+    def classify(features=FEATURES):
+        extracted.clear()
+        return simulations.classify(
+            features, normalization, output_dir="classification", incremental=True
+        ).features
+
+    expected = classify()
+    assert sorted(extracted) == tiny_models.patients
+    # The normalization passed by the caller is not modified.
+    assert all(value["condition"] == [] for value in normalization.values())
+    pd.testing.assert_frame_equal(classify(), expected)
+    assert extracted == []
+    # Patients whose simulation results changed are processed again.
+    path = os.path.join(
+        tiny_models.path_to_models, "patient1", "simulation_data", "simulations_all.npy"
+    )
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    pd.testing.assert_frame_equal(classify(), expected)
+    assert extracted == ["patient1"]
+    # So are all patients if the extraction settings changed.
+    classify(dict(FEATURES, Bound_R={"high": ["max"]}))
+    assert sorted(extracted) == tiny_models.patients
+
+
+def normalize_per_paramset(data, conditions, normalization):
+    # Normalization before it was vectorized, one parameter set at a time
+    idx_conditions = [conditions.index(c) for c in normalization["condition"] or conditions]
+    for i in range(data.shape[0]):
+        if not np.isnan(data[i]).all() and not np.all(data[i] == 0.0):
+            data[i] /= (
+                data[i][idx_conditions, normalization["timepoint"]]
+                if normalization["timepoint"] is not None
+                else np.nanmax(data[i][idx_conditions])
+            )
+    data = np.nanmean(data, axis=0)
+    norm_max = np.max(data[idx_conditions])
+    if normalization["timepoint"] is None and norm_max != 0.0:
+        data /= norm_max
+    return data
+
+
+@pytest.mark.parametrize(
+    "timepoint, condition", [(None, []), (None, ["high"]), (30, ["high"]), (0, ["high"])]
+)
+def test_normalize(timepoint, condition):
+    data = np.random.default_rng(0).uniform(0.0, 1.0, (5, 2, 61))
+    data[0, 1, 10] = np.nan
+    data[1] = np.nan  # failed simulation
+    data[2] = 0.0  # vanished time courses
+    data[3, 0] = 0.0  # one condition vanished
+    normalization = {"obs": {"timepoint": timepoint, "condition": condition}}
+    expected = normalize_per_paramset(data.copy(), ["low", "high"], normalization["obs"])
+    normalized = PatientModelSimulations._normalize(
+        data.copy(), ["low", "high"], "obs", normalization
+    )
+    np.testing.assert_allclose(normalized, expected)
+    assert normalization["obs"]["condition"] == condition
+
+
+def test_identify_metrics(tiny_models, monkeypatch):
+    identify = PatientModelSimulations._identify
+    assert identify(auc) == "pasmopy.response_characteristics.auc"
+    # Partial metrics are identified by their arguments, not by their memory address.
+    assert identify(partial(auc, method="trapezoid")) == identify(partial(auc, method="trapezoid"))
+    assert identify(partial(auc, method="trapezoid")) != identify(partial(auc))
+    for ambiguous in [lambda time_course: 0.0, partial(auc, method=object())]:
+        assert identify(ambiguous) is None
+    # Metrics that cannot be identified are never reused.
+    simulations = PatientModelSimulations(*tiny_models)
+    simulations.run(n_proc=1, progress=False)
+    simulations.response_characteristics["range"] = lambda time_course: np.ptp(time_course)
+    extracted = []
+
+    def extract_single_patient(*args):
+        extracted.append(args[-1])
+        return _extract_single_patient(*args)
+
+    monkeypatch.setattr(patient_model, "_extract_single_patient", extract_single_patient)
+    for _ in range(2):
+        extracted.clear()
+        simulations.classify(
+            {"Bound_R": {"high": ["range"]}},
+            NORMALIZATION,
+            output_dir="classification",
+            incremental=True,
+        )
+        assert sorted(extracted) == tiny_models.patients
@@ -0,0 +1,44 @@
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+from biomass.model_object import OptimizedValues
+
+from pasmopy import PatientOverlay
+
+
+def make_model() -> SimpleNamespace:
+    return SimpleNamespace(
+        parameters=["k1", "k2", "k3"],
+        species=["A", "B"],
+        pval=lambda: [1.0, 2.0, 3.0],
+        ival=lambda: [10.0, 0.0],
+        load_param=lambda paramset: OptimizedValues([0.1 * paramset] * 3, [5.0, 0.0]),
+    )
+
+
+def test_read_write():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dirname = os.path.join(tmpdir, "patient1")
+        assert PatientOverlay.read(dirname) == PatientOverlay("patient1")
+        overlay = PatientOverlay("TCGA_3C_AALK_01A", parameters={"k2": 0.5})
+        overlay.write(dirname)
+        assert PatientOverlay.read(dirname) == overlay
+
+
+def test_apply():
+    model = make_model()
+    overlay = PatientOverlay("patient1", parameters={"k2": 0.5}, initial_conditions={"B": 1.0})
+    patient_specific = overlay.apply(model)
+    assert patient_specific.pval() == [1.0, 0.5, 3.0]
+    assert patient_specific.ival() == [10.0, 1.0]
+    optimized = patient_specific.load_param(2)
+    assert isinstance(optimized, OptimizedValues)
+    assert optimized.params == [0.2, 0.5, 0.2]
+    assert optimized.initials == [5.0, 1.0]
+    # The base model is left untouched.
+    assert model.pval() == [1.0, 2.0, 3.0]
+    assert model.load_param(2).initials == [5.0, 0.0]
+    with pytest.raises(NameError):
+        PatientOverlay("patient1", parameters={"k4": 1.0}).apply(model)
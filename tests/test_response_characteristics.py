@@ -0,0 +1,112 @@
+from functools import partial
+
+import numpy as np
+from scipy.integrate import simpson, trapezoid
+
+from pasmopy import PatientModelSimulations
+from pasmopy.response_characteristics import (
+    auc,
+    cumulative_auc,
+    duration,
+    final_value,
+    half_life,
+    is_vectorized,
+    maximum,
+    sustained_ratio,
+    time_to_peak,
+    uses_time,
+    vectorized,
+)
+
+TIME_COURSES: np.ndarray = np.random.default_rng(0).uniform(0.0, 1.0, (5, 61))
+
+
+def test_builtin_characteristics():
+    for func, reference in [(maximum, np.max), (auc, simpson)]:
+        assert is_vectorized(func)
+        assert np.allclose(
+            func(TIME_COURSES, axis=-1), [reference(time_course) for time_course in TIME_COURSES]
+        )
+
+
+def test_apply_metric():
+    def get_droprate(time_course: np.ndarray) -> float:
+        return -(time_course[-1] - np.max(time_course)) / (
+            len(time_course) - np.argmax(time_course)
+        )
+
+    @vectorized
+    def get_droprate_vectorized(time_course: np.ndarray, axis: int = -1) -> np.ndarray:
+        return -(np.take(time_course, -1, axis=axis) - np.max(time_course, axis=axis)) / (
+            time_course.shape[axis] - np.argmax(time_course, axis=axis)
+        )
+
+    assert not is_vectorized(get_droprate)
+    t = np.arange(61.0)
+    stacked, t_stacked = PatientModelSimulations._stack(list(TIME_COURSES), [t] * 5)
+    assert isinstance(stacked, np.ndarray)
+    assert np.allclose(
+        PatientModelSimulations._apply_metric(get_droprate, stacked, t_stacked),
+        PatientModelSimulations._apply_metric(get_droprate_vectorized, stacked, t_stacked),
+    )
+    # Time courses of different lengths are processed one by one.
+    time_courses = [TIME_COURSES[0], TIME_COURSES[1, :31]]
+    times = [t, t[:31] * 2]
+    assert isinstance(PatientModelSimulations._stack(time_courses, times)[0], list)
+    assert np.allclose(
+        PatientModelSimulations._apply_metric(
+            get_droprate_vectorized, *PatientModelSimulations._stack(time_courses, times)
+        ),
+        [get_droprate(time_course) for time_course in time_courses],
+    )
+    assert np.allclose(
+        PatientModelSimulations._apply_metric(
+            auc, *PatientModelSimulations._stack(time_courses, times)
+        ),
+        [simpson(time_course, x=t_i) for time_course, t_i in zip(time_courses, times)],
+    )
+
+
+def test_dynamic_features():
+    t = np.linspace(0, 60, 601)
+    # Rises to the peak at t = 10 and decays with a half-life of 5.
+    time_courses = np.stack(
+        [
+            amplitude * np.where(t < 10, t / 10, np.exp(-np.log(2) * (t - 10) / 5))
+            for amplitude in [1.0, 2.0, 0.5]
+        ]
+    )
+    assert np.allclose(time_to_peak(time_courses, t=t), 10.0)
+    assert np.allclose(half_life(time_courses, t=t), 5.0, atol=1e-3)
+    assert np.allclose(duration(time_courses, t=t), 10.0, atol=1e-2)
+    assert np.allclose(sustained_ratio(time_courses), 2.0**-10)
+    assert np.allclose(final_value(time_courses), time_courses[:, -1])
+    # Time along the first axis
+    assert np.allclose(half_life(time_courses.T, axis=0, t=t), half_life(time_courses, t=t))
+    # A single time course
+    assert np.isclose(half_life(time_courses[0], t=t), half_life(time_courses, t=t)[0])
+    # No decay and no signal
+    flat = np.stack([np.ones_like(t), np.zeros_like(t)])
+    assert np.isnan(half_life(flat, t=t)).all()
+    assert np.isclose(duration(flat, t=t)[0], 60.0)
+    assert np.isnan(sustained_ratio(flat)[1])
+    assert is_vectorized(partial(duration, threshold=0.1))
+
+
+def test_auc():
+    # Nonuniform time points
+    t = np.sort(np.random.default_rng(1).uniform(0, 100, 61))
+    time_courses = np.sin(t / 20) ** 2 * np.arange(1, 6)[:, np.newaxis]
+    assert uses_time(auc) and uses_time(partial(auc, method="trapezoid"))
+    assert not uses_time(maximum)
+    assert np.allclose(
+        auc(time_courses, t=t), [simpson(time_course, x=t) for time_course in time_courses]
+    )
+    assert np.allclose(auc(time_courses, t=t, method="trapezoid"), trapezoid(time_courses, x=t))
+    cumulative = cumulative_auc(time_courses, t=t)
+    assert cumulative.shape == time_courses.shape
+    assert np.allclose(cumulative[:, -1], auc(time_courses, t=t, method="trapezoid"))
+    stacked, t_stacked = PatientModelSimulations._stack(list(time_courses), [t] * 5)
+    assert np.allclose(
+        PatientModelSimulations._apply_metric(auc, stacked, t_stacked), auc(time_courses, t=t)
+    )